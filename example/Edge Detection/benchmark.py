@@ -0,0 +1,329 @@
+"""
+Edge Detection Benchmark
+에지 검출 구현의 지연 시간과 메모리 사용량을 비교하는 벤치마크
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from main import EdgeDetector
+
+# 기본 입력 이미지 (main.py와 동일)
+DEFAULT_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "2148664187_be75e2c40b_z.jpg")
+
+# 벤치마크 스위트에서 측정할 방법 (이름: EdgeDetector 메서드)
+SUITE_METHODS = {
+    'canny': 'canny_edge_detection',
+    'adaptive_canny': 'adaptive_canny_edge_detection',
+    'sobel': 'sobel_edge_detection',
+    'laplacian': 'laplacian_edge_detection',
+    'morphological': 'morphological_edge_detection',
+    'enhanced': 'enhanced_edge_detection',
+}
+
+# 벤치마크 스위트의 해상도 (이름: (너비, 높이))
+SUITE_RESOLUTIONS = {
+    'VGA': (640, 480),
+    'HD': (1280, 720),
+    'FHD': (1920, 1080),
+    '4K': (3840, 2160),
+    '8K': (7680, 4320),
+}
+
+def load_benchmark_image(image_path, width=None):
+    """
+    벤치마크용 이미지를 로드하고 필요하면 지정한 너비로 크기를 조정합니다.
+    """
+    image = cv2.imread(image_path)
+    if image is None:
+        raise ValueError(f"이미지를 읽을 수 없습니다: {image_path}")
+
+    if width is not None and width != image.shape[1]:
+        height = int(round(image.shape[0] * width / image.shape[1]))
+        image = cv2.resize(image, (width, height), interpolation=cv2.INTER_CUBIC)
+
+    return image
+
+def measure(func, repeats=20, warmup=2):
+    """
+    함수의 지연 시간과 메모리 피크를 측정합니다.
+
+    메모리 피크는 tracemalloc으로 측정하며 NumPy 배열(OpenCV 출력 포함)만 집계됩니다.
+    OpenCV 내부 C++ 임시 버퍼는 포함되지 않습니다.
+    Returns:
+        측정 결과 딕셔너리 (시간 단위: ms, 메모리 단위: MB)
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # 메모리 측정은 지연 시간 측정과 분리 (tracemalloc 오버헤드 제외)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(latencies)
+    return {
+        'mean_ms': float(latencies.mean()),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'peak_mb': peak / (1024 * 1024),
+    }
+
+def benchmark_fused_enhanced(image, repeats=20):
+    """
+    기존 enhanced_edge_detection()과 융합 구현을 비교합니다.
+    두 경우 모두 매 반복마다 캐시를 비워 전처리부터 다시 계산합니다.
+    융합 구현의 메모리 피크는 재사용 버퍼 할당을 포함하도록 새 검출기에서 측정합니다.
+    """
+    detector = EdgeDetector(None, None, verbose=False)
+
+    def run_legacy():
+        detector.invalidate_cache()
+        return detector.enhanced_edge_detection(image)
+
+    def run_fused():
+        detector.invalidate_cache()
+        return detector.enhanced_edge_detection_fused(image)
+
+    legacy = measure(run_legacy, repeats)
+    fused = measure(run_fused, repeats)
+
+    # 융합 구현의 버퍼는 워밍업 중에 할당되어 재사용되므로, 메모리 피크는 새 검출기로 다시 측정하고
+    # 상주 버퍼 크기를 따로 보고함
+    def run_fused_cold():
+        cold = EdgeDetector(None, None, verbose=False)
+        cold.enhanced_edge_detection_fused(image)
+        return cold
+
+    tracemalloc.start()
+    cold = run_fused_cold()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    fused['peak_mb'] = peak / (1024 * 1024)
+    fused['resident_mb'] = sum(buffer.nbytes for buffer in cold._fused_buffers.values()) / (1024 * 1024)
+
+    # 정확도 비교 (다른 픽셀 비율)
+    mismatch = np.count_nonzero(run_legacy() != run_fused()) / image.shape[0] / image.shape[1]
+
+    print(f"\n=== Enhanced 기존 구현 vs 융합 구현 ({image.shape[1]}x{image.shape[0]}) ===")
+    print(f"{'구현':<10}{'평균(ms)':>12}{'p50(ms)':>12}{'p95(ms)':>12}{'메모리 피크(MB)':>18}")
+    for name, result in (('legacy', legacy), ('fused', fused)):
+        print(f"{name:<10}{result['mean_ms']:>12.2f}{result['p50_ms']:>12.2f}"
+              f"{result['p95_ms']:>12.2f}{result['peak_mb']:>18.2f}")
+    print(f"속도 향상: {legacy['mean_ms'] / fused['mean_ms']:.2f}x, "
+          f"메모리 감소: {legacy['peak_mb'] / max(fused['peak_mb'], 1e-6):.2f}x, "
+          f"결과 불일치 픽셀: {mismatch * 100:.4f}%")
+    print(f"융합 구현 상주 버퍼: {fused['resident_mb']:.2f}MB (메모리 피크에 포함)")
+
+    return {'legacy': legacy, 'fused': fused, 'mismatch_ratio': mismatch}
+
+def benchmark_median(image, repeats=20):
+    """
+    적응형 Canny 임계값의 중간값 계산 방식을 비교합니다.
+    (np.median 정렬 기반 vs 히스토그램 vs 추출 히스토그램)
+    """
+    reference = EdgeDetector(None, None, verbose=False)
+    gray, blurred = reference.preprocess_image(image)
+    exact = reference._compute_median(blurred)
+    exact_thresholds = reference._adaptive_thresholds(image)
+
+    print(f"\n=== 중간값 계산 방식 비교 ({image.shape[1]}x{image.shape[0]}) ===")
+    print(f"{'방식':<12}{'평균(ms)':>12}{'p95(ms)':>12}{'중간값':>10}{'임계값':>14}")
+    results = {}
+    for method in EdgeDetector.MEDIAN_METHODS:
+        detector = EdgeDetector(None, None, verbose=False, median_method=method)
+        result = measure(lambda: detector._compute_median(blurred), repeats)
+        result['median'] = float(detector._compute_median(blurred))
+        result['thresholds'] = detector._adaptive_thresholds(image)
+        results[method] = result
+        print(f"{method:<12}{result['mean_ms']:>12.3f}{result['p95_ms']:>12.3f}"
+              f"{result['median']:>10.1f}{str(result['thresholds']):>14}")
+
+    print(f"기준 (np.median): 중간값={exact}, 임계값={exact_thresholds}")
+    return results
+
+def make_suite_image(resolution, image_path=None, seed=0):
+    """
+    스위트용 입력 이미지를 만듭니다.
+    image_path가 있으면 해당 이미지를 해상도에 맞게 늘리고, 없으면 시드 고정
+    합성 이미지(도형 + 잡음)를 생성하여 실행마다 같은 입력을 사용합니다.
+    """
+    width, height = resolution
+    if image_path is not None:
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"이미지를 읽을 수 없습니다: {image_path}")
+        return cv2.resize(image, (width, height), interpolation=cv2.INTER_CUBIC)
+
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 40, size=(height, width, 3), dtype=np.uint8)
+    for _ in range(64):
+        color = tuple(int(c) for c in rng.integers(60, 256, size=3))
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        radius = int(rng.integers(min(width, height) // 40 + 1, min(width, height) // 6 + 2))
+        if rng.random() < 0.5:
+            cv2.circle(image, center, radius, color, -1)
+        else:
+            cv2.rectangle(image, center, (center[0] + radius, center[1] + radius), color, -1)
+    return image
+
+def _peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB)"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def _run_suite_case(case):
+    """
+    벤치마크 한 건을 실행합니다. (독립된 프로세스에서 실행되어 최대 RSS를 분리 측정)
+    """
+    method, resolution_name, threads, image_path, repeats, warmup = case
+    cv2.setNumThreads(threads)
+
+    image = make_suite_image(SUITE_RESOLUTIONS[resolution_name], image_path)
+    detector = EdgeDetector(None, None, verbose=False)
+    func = getattr(detector, SUITE_METHODS[method])
+    baseline_rss = _peak_rss_mb()
+
+    def run():
+        # 캐시를 비워 전처리부터 매번 다시 계산
+        detector.invalidate_cache()
+        func(image)
+
+    for _ in range(warmup):
+        run()
+
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+    width, height = SUITE_RESOLUTIONS[resolution_name]
+
+    return {
+        'method': method,
+        'resolution': resolution_name,
+        'width': width,
+        'height': height,
+        'threads': threads,
+        'effective_threads': cv2.getNumThreads(),
+        'repeats': repeats,
+        'latency_ms': {
+            'mean': float(latencies.mean()),
+            'min': float(latencies.min()),
+            'p50': float(np.percentile(latencies, 50)),
+            'p90': float(np.percentile(latencies, 90)),
+            'p99': float(np.percentile(latencies, 99)),
+            'max': float(latencies.max()),
+        },
+        'images_per_sec': float(1000.0 / latencies.mean()),
+        'megapixels_per_sec': float(width * height / 1e6 * 1000.0 / latencies.mean()),
+        'peak_rss_mb': _peak_rss_mb(),
+        'input_rss_mb': baseline_rss,
+    }
+
+def run_suite(methods=None, resolutions=None, threads=(1, -1), image_path=None,
+              repeats=20, warmup=3, output_path=None):
+    """
+    모든 에지 검출 방법을 해상도와 스레드 수별로 측정하여 JSON으로 저장합니다.
+    각 측정은 새 프로세스에서 실행되므로 최대 RSS가 서로 섞이지 않습니다.
+    Args:
+        methods: 측정할 방법 목록 (None이면 SUITE_METHODS 전체)
+        resolutions: 해상도 이름 목록 (None이면 SUITE_RESOLUTIONS 전체)
+        threads: cv2.setNumThreads 값 목록 (0은 스레드 미사용, 음수는 OpenCV 기본값)
+        image_path: 입력 이미지 (None이면 시드 고정 합성 이미지)
+        repeats, warmup: 반복 측정 / 예열 횟수
+        output_path: JSON 저장 경로 (None이면 저장하지 않음)
+    Returns:
+        결과 딕셔너리
+    """
+    methods = methods or list(SUITE_METHODS)
+    resolutions = resolutions or list(SUITE_RESOLUTIONS)
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'image': os.path.basename(image_path) if image_path else 'synthetic',
+        },
+        'results': [],
+    }
+
+    context = multiprocessing.get_context('spawn')
+    for resolution_name in resolutions:
+        for thread_count in threads:
+            for method in methods:
+                case = (method, resolution_name, thread_count, image_path, repeats, warmup)
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(_run_suite_case, case).result()
+                report['results'].append(result)
+                print(f"{method:<16}{resolution_name:>6}  threads={thread_count:<3}"
+                      f"p50={result['latency_ms']['p50']:>9.2f}ms  "
+                      f"p99={result['latency_ms']['p99']:>9.2f}ms  "
+                      f"{result['images_per_sec']:>8.2f} img/s  "
+                      f"RSS={result['peak_rss_mb']:>8.1f}MB")
+
+    if output_path is not None:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"벤치마크 결과 저장: {output_path}")
+
+    return report
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="에지 검출 벤치마크")
+    parser.add_argument('--image', default=DEFAULT_IMAGE, help="입력 이미지 경로")
+    parser.add_argument('--widths', type=int, nargs='+', default=[640, 1920, 4000],
+                        help="벤치마크할 이미지 너비 목록")
+    parser.add_argument('--repeats', type=int, default=20, help="반복 측정 횟수")
+    parser.add_argument('--suite', action='store_true',
+                        help="전체 방법 x 해상도 x 스레드 수 벤치마크 스위트 실행")
+    parser.add_argument('--methods', nargs='+', choices=list(SUITE_METHODS),
+                        help="스위트에서 측정할 방법")
+    parser.add_argument('--resolutions', nargs='+', choices=list(SUITE_RESOLUTIONS),
+                        help="스위트에서 측정할 해상도")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, -1],
+                        help="스위트에서 측정할 cv2.setNumThreads 값 (0은 스레드 미사용, -1은 기본값)")
+    parser.add_argument('--synthetic', action='store_true',
+                        help="스위트 입력으로 시드 고정 합성 이미지 사용")
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help="스위트 결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.suite:
+        run_suite(args.methods, args.resolutions, args.threads,
+                  image_path=None if args.synthetic else args.image,
+                  repeats=args.repeats, output_path=args.output)
+        return
+
+    for width in args.widths:
+        image = load_benchmark_image(args.image, width)
+        benchmark_fused_enhanced(image, args.repeats)
+        benchmark_median(image, args.repeats)
+
+if __name__ == "__main__":
+    main()
@@ -5,21 +5,135 @@ AI-powered Edge Detection Algorithm
 
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 from PIL import Image
 import os
+import glob
+import time
+import argparse
+import inspect
+import multiprocessing
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 배치 모드에서 처리할 이미지 확장자
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+
+def histogram_median(hist):
+    """
+    256-bin 히스토그램에서 np.median()과 동일한 중간값을 계산합니다.
+    Args:
+        hist: uint8 이미지의 픽셀 값별 개수 (길이 256)
+    Returns:
+        중간값 (짝수 개이면 가운데 두 값의 평균)
+    """
+    cumulative = np.cumsum(np.asarray(hist, dtype=np.int64).ravel())
+    total = int(cumulative[-1])
+    lower = int(np.searchsorted(cumulative, (total - 1) // 2, side='right'))
+    upper = int(np.searchsorted(cumulative, total // 2, side='right'))
+    return (lower + upper) / 2.0
+
+def adaptive_thresholds(median, sigma=0.33):
+    """
+    중간값을 기반으로 적응형 Canny의 하위/상위 임계값을 계산합니다.
+    Returns:
+        (하위 임계값, 상위 임계값)
+    """
+    low_threshold = int(max(0, (1.0 - sigma) * median))
+    high_threshold = int(min(255, (1.0 + sigma) * median))
+    return low_threshold, high_threshold
 
 class EdgeDetector:
-    def __init__(self, input_image_path, output_image_path):
+    # 에지 검출 노드 레지스트리 (노드 이름: 함수, 입력 노드, 표시 이름, 파라미터 기본값)
+    # 기본 노드는 클래스 정의 아래에서 register_method()로 등록됩니다.
+    _registry = {}
+    
+    # 스트리밍(비디오) 모드에서 지원하는 방법
+    STREAM_METHODS = ('canny', 'adaptive_canny', 'enhanced')
+    
+    # 적응형 Canny 임계값 계산에 사용할 중간값 계산 방식
+    MEDIAN_METHODS = ('exact', 'histogram', 'subsample')
+    
+    def __init__(self, input_image_path, output_image_path, blur_ksize=(5, 5), blur_sigma=0,
+                 verbose=True, median_method='exact', median_subsample=4):
         """
         에지 검출기 초기화
         Args:
             input_image_path (str): 입력 이미지 경로
             output_image_path (str): 출력 이미지 경로
+            blur_ksize (tuple): 전처리 가우시안 블러 커널 크기
+            blur_sigma (float): 전처리 가우시안 블러 시그마
+            verbose (bool): 진행 상황 및 임계값 출력 여부
+            median_method (str): 중간값 계산 방식
+                'exact' - np.median (기본값)
+                'histogram' - 256-bin 히스토그램, np.median과 동일한 값을 선형 시간에 계산
+                'subsample' - median_subsample 간격으로 추린 픽셀의 히스토그램 (근사값)
+            median_subsample (int): 'subsample' 방식의 가로/세로 추출 간격
         """
+        if median_method not in self.MEDIAN_METHODS:
+            raise ValueError(f"알 수 없는 중간값 계산 방식: {median_method} (사용 가능: {self.MEDIAN_METHODS})")
+        
         self.input_path = input_image_path
         self.output_path = output_image_path
-        self.image = None
+        self.blur_ksize = tuple(blur_ksize)
+        self.blur_sigma = blur_sigma
+        self.verbose = verbose
+        self.median_method = median_method
+        self.median_subsample = median_subsample
+        
+        # 이미지별 중간 결과 캐시 (그레이, 블러, 중간값, 그래디언트, 에지 맵)
+        self._cache = {}
+        self._cache_image = None
+        self._cache_key = None
+        self._image = None
+        
+        # 융합 Enhanced 구현에서 재사용하는 버퍼
+        self._fused_buffers = None
+        
+        # 타일 처리 시 이미지 전체에서 계산한 통계 (중간값, Sobel 최대값)
+        # 설정되어 있으면 타일 자체의 통계 대신 사용하여 타일 경계를 이음매 없이 맞춤
+        self.global_stats = None
+    
+    @property
+    def image(self):
+        return self._image
+    
+    @image.setter
+    def image(self, value):
+        # 이미지가 바뀌면 이전 이미지의 중간 결과는 더 이상 유효하지 않음
+        self._image = value
+        self.invalidate_cache()
+    
+    def invalidate_cache(self):
+        """
+        중간 결과 캐시를 비웁니다.
+        이미지 배열을 제자리에서(in-place) 수정한 경우 직접 호출해야 합니다.
+        """
+        self._cache = {}
+        self._cache_image = None
+        self._cache_key = None
+    
+    def _cached(self, image, name, compute):
+        """
+        이미지와 블러 파라미터를 키로 중간 결과를 한 번만 계산하여 재사용합니다.
+        Args:
+            image: 입력 이미지
+            name: 중간 결과 이름 (파라미터가 있으면 튜플)
+            compute: 캐시에 없을 때 호출할 계산 함수
+        Returns:
+            캐시된 결과 (반환된 배열은 수정하지 마십시오)
+        """
+        key = (self.blur_ksize, self.blur_sigma)
+        # id() 대신 객체 자체를 보관하여 같은 이미지인지 비교 (id 재사용 방지)
+        if self._cache_image is not image or self._cache_key != key:
+            self._cache = {}
+            self._cache_image = image
+            self._cache_key = key
+        
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
         
     def load_image(self):
         """이미지를 로드합니다."""
@@ -30,18 +144,137 @@ class EdgeDetector:
         if self.image is None:
             raise ValueError("이미지를 읽을 수 없습니다.")
         
-        print(f"이미지 로드 완료: {self.image.shape}")
+        if self.verbose:
+            print(f"이미지 로드 완료: {self.image.shape}")
         return self.image
     
+    @classmethod
+    def register_method(cls, name, func=None, inputs=('blurred',), label=None):
+        """
+        에지 검출 방법(또는 중간 결과)을 레지스트리에 등록합니다.
+        클래스를 수정하지 않고 사용자 정의 방법을 추가할 수 있으며, 등록된 방법은
+        compute()로 계산되고 label이 있으면 비교 결과에도 포함됩니다.
+        
+        사용 예:
+            @EdgeDetector.register_method('scharr', inputs=('blurred',), label='Scharr')
+            def scharr(detector, blurred):
+                return cv2.convertScaleAbs(cv2.Scharr(blurred, cv2.CV_16S, 1, 0))
+        Args:
+            name: 노드 이름
+            func: func(detector, *입력값, **파라미터) -> 결과 (None이면 데코레이터로 사용)
+            inputs: 의존하는 노드 이름 목록 ('image'는 입력 이미지 자체)
+            label: 비교 결과에 표시할 이름 (None이면 중간 결과로만 사용)
+        """
+        if func is None:
+            def decorator(f):
+                cls.register_method(name, f, inputs, label)
+                return f
+            return decorator
+        
+        # 하위 클래스에서 등록하면 상위 클래스의 레지스트리는 그대로 둠
+        if '_registry' not in cls.__dict__:
+            cls._registry = dict(cls._registry)
+        
+        # 파라미터 기본값 (캐시 키에 포함하여 같은 파라미터의 결과를 공유)
+        defaults = {param.name: param.default
+                    for param in inspect.signature(func).parameters.values()
+                    if param.default is not inspect.Parameter.empty}
+        cls._registry[name] = {'func': func, 'inputs': tuple(inputs),
+                               'label': label, 'defaults': defaults}
+        return func
+    
+    @classmethod
+    def method_labels(cls):
+        """
+        비교 결과에 표시할 방법 목록
+        Returns:
+            {표시 이름: 노드 이름} 딕셔너리 (등록 순서)
+        """
+        return {node['label']: name for name, node in cls._registry.items()
+                if node['label'] is not None}
+    
+    def compute(self, name, image=None, **params):
+        """
+        등록된 노드를 의존성 그래프를 따라 필요한 만큼만 계산합니다.
+        공통 입력(그레이, 블러, 그래디언트 등)은 이미지당 한 번만 계산됩니다.
+        Args:
+            name: 노드 이름
+            image: 입력 이미지 (None이면 self.image)
+            **params: 대상 노드의 파라미터 (의존 노드는 기본값 사용)
+        Returns:
+            계산 결과 (캐시된 배열이므로 수정하지 마십시오)
+        """
+        if image is None:
+            if self.image is None:
+                self.load_image()
+            image = self.image
+        return self._evaluate(name, image, params, ())
+    
+    def _evaluate(self, name, image, params, visiting):
+        """노드 하나를 평가합니다. 입력 노드를 먼저 재귀적으로 평가합니다."""
+        if name == 'image':
+            return image
+        
+        node = self._registry.get(name)
+        if node is None:
+            raise ValueError(f"등록되지 않은 에지 검출 노드: {name}")
+        if name in visiting:
+            raise ValueError(f"순환 의존성: {' -> '.join(visiting + (name,))}")
+        
+        merged = dict(node['defaults'])
+        merged.update(params)
+        key = (name, tuple(sorted(merged.items()))) if merged else name
+        
+        def run():
+            values = [self._evaluate(dep, image, {}, visiting + (name,)) for dep in node['inputs']]
+            return node['func'](self, *values, **merged)
+        
+        return self._cached(image, key, run)
+    
+    def _depends_on(self, name, targets):
+        """노드가 targets 중 하나에 (간접적으로라도) 의존하는지 확인합니다."""
+        if name in targets:
+            return True
+        node = self._registry.get(name)
+        return node is not None and any(self._depends_on(dep, targets) for dep in node['inputs'])
+    
     def preprocess_image(self, image):
-        """이미지 전처리를 수행합니다."""
-        # 그레이스케일 변환
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        """이미지 전처리를 수행합니다. (이미지당 한 번만 계산)"""
+        return self.compute('gray', image), self.compute('blurred', image)
+    
+    def _median(self, image):
+        """블러 이미지의 중간값을 계산합니다. (이미지당 한 번만 계산)"""
+        return self.compute('median', image)
+    
+    def _compute_median(self, blurred):
+        """median_method 설정에 따라 블러 이미지의 중간값을 계산합니다."""
+        if self.median_method == 'exact':
+            return np.median(blurred)
         
-        # 가우시안 블러를 적용하여 노이즈 제거
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        if self.median_method == 'subsample':
+            step = self.median_subsample
+            blurred = np.ascontiguousarray(blurred[::step, ::step])
         
-        return gray, blurred
+        hist = cv2.calcHist([blurred], [0], None, [256], [0, 256])
+        return histogram_median(hist)
+    
+    def _adaptive_thresholds(self, image, sigma=0.33):
+        """중간값을 기반으로 적응형 Canny의 하위/상위 임계값을 계산합니다."""
+        return adaptive_thresholds(self._median(image), sigma)
+    
+    def _sobel_gradients(self, image):
+        """Sobel X, Y 방향 그래디언트를 계산합니다. (이미지당 한 번만 계산)"""
+        return self.compute('sobel_x', image), self.compute('sobel_y', image)
+    
+    def _sobel_magnitude(self, image):
+        """Sobel 그래디언트 크기를 계산합니다. (이미지당 한 번만 계산)"""
+        return self.compute('sobel_magnitude', image)
+    
+    def _sobel_max(self, magnitude):
+        """Sobel 결과 정규화에 사용할 최대 그래디언트 크기"""
+        if self.global_stats is not None:
+            return self.global_stats['sobel_max']
+        return magnitude.max()
     
     def canny_edge_detection(self, image, low_threshold=50, high_threshold=150):
         """
@@ -53,12 +286,7 @@ class EdgeDetector:
         Returns:
             에지가 검출된 이미지
         """
-        gray, blurred = self.preprocess_image(image)
-        
-        # Canny 에지 검출
-        edges = cv2.Canny(blurred, low_threshold, high_threshold)
-        
-        return edges
+        return self.compute('canny', image, low_threshold=low_threshold, high_threshold=high_threshold)
     
     def adaptive_canny_edge_detection(self, image, sigma=0.33):
         """
@@ -69,19 +297,7 @@ class EdgeDetector:
         Returns:
             에지가 검출된 이미지
         """
-        gray, blurred = self.preprocess_image(image)
-        
-        # 중간값을 기반으로 자동 임계값 계산
-        median = np.median(blurred)
-        low_threshold = int(max(0, (1.0 - sigma) * median))
-        high_threshold = int(min(255, (1.0 + sigma) * median))
-        
-        print(f"자동 계산된 임계값: Low={low_threshold}, High={high_threshold}")
-        
-        # Canny 에지 검출
-        edges = cv2.Canny(blurred, low_threshold, high_threshold)
-        
-        return edges
+        return self.compute('adaptive_canny', image, sigma=sigma)
     
     def sobel_edge_detection(self, image):
         """
@@ -89,17 +305,7 @@ class EdgeDetector:
         Returns:
             에지가 검출된 이미지
         """
-        gray, blurred = self.preprocess_image(image)
-        
-        # Sobel X와 Y 방향 그래디언트 계산
-        sobel_x = cv2.Sobel(blurred, cv2.CV_64F, 1, 0, ksize=3)
-        sobel_y = cv2.Sobel(blurred, cv2.CV_64F, 0, 1, ksize=3)
-        
-        # 그래디언트 크기 계산
-        sobel_magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
-        sobel_magnitude = np.uint8(sobel_magnitude / sobel_magnitude.max() * 255)
-        
-        return sobel_magnitude
+        return self.compute('sobel', image)
     
     def laplacian_edge_detection(self, image):
         """
@@ -107,13 +313,7 @@ class EdgeDetector:
         Returns:
             에지가 검출된 이미지
         """
-        gray, blurred = self.preprocess_image(image)
-        
-        # Laplacian 필터 적용
-        laplacian = cv2.Laplacian(blurred, cv2.CV_64F)
-        laplacian = np.uint8(np.absolute(laplacian))
-        
-        return laplacian
+        return self.compute('laplacian', image)
     
     def morphological_edge_detection(self, image):
         """
@@ -121,13 +321,7 @@ class EdgeDetector:
         Returns:
             에지가 검출된 이미지
         """
-        gray, blurred = self.preprocess_image(image)
-        
-        # 형태학적 그래디언트
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-        morph_gradient = cv2.morphologyEx(blurred, cv2.MORPH_GRADIENT, kernel)
-        
-        return morph_gradient
+        return self.compute('morphological', image)
     
     def enhanced_edge_detection(self, image):
         """
@@ -135,42 +329,161 @@ class EdgeDetector:
         Returns:
             향상된 에지가 검출된 이미지
         """
-        # 다양한 방법으로 에지 검출
-        canny_edges = self.adaptive_canny_edge_detection(image)
-        sobel_edges = self.sobel_edge_detection(image)
-        laplacian_edges = self.laplacian_edge_detection(image)
+        return self.compute('enhanced', image)
+    
+    def enhanced_edge_detection_fused(self, image, out=None, sigma=0.33):
+        """
+        enhanced_edge_detection()과 같은 결과를 float32/int16 중간값과
+        미리 할당된 버퍼로 계산하는 융합(fused) 구현
+        
+        float64 임시 배열을 만들지 않고 cv2.magnitude, cv2.convertScaleAbs 및
+        각 함수의 dst 인자로 같은 크기의 버퍼를 호출 간에 재사용합니다.
+        
+        허용 오차 (기존 구현 대비):
+            - Sobel 맵: float32 반올림 차이로 최대 ±1 레벨
+            - Laplacian 맵: |값| <= 255 에서 동일 (그 이상은 기존 구현이 uint8로
+              넘침(wrap)되는 반면 여기서는 255로 포화)
+            - 최종 이진 결과: 다른 픽셀 비율 0.1% 이하
+        Args:
+            image: 입력 이미지
+            out: 결과를 쓸 uint8 배열 (None이면 내부 버퍼 사용)
+            sigma: 적응형 Canny 임계값 계산을 위한 시그마 값
+        Returns:
+            향상된 에지가 검출된 이미지 (내부 버퍼는 다음 호출에서 덮어써짐)
+        """
+        gray, blurred = self.preprocess_image(image)
+        buffers = self._get_fused_buffers(blurred.shape)
+        if out is None:
+            out = buffers['out']
         
-        # 가중 평균으로 결합
-        combined = cv2.addWeighted(canny_edges, 0.5, sobel_edges, 0.3, 0)
-        combined = cv2.addWeighted(combined, 0.8, laplacian_edges, 0.2, 0)
+        # 적응형 Canny (중간값은 캐시에서 재사용)
+        low_threshold, high_threshold = self._adaptive_thresholds(image, sigma)
+        cv2.Canny(blurred, low_threshold, high_threshold, edges=buffers['canny'])
         
-        # 결과 향상을 위한 후처리
-        # 가우시안 블러로 부드럽게 처리
-        enhanced = cv2.GaussianBlur(combined, (3, 3), 0)
+        # Sobel 그래디언트 크기 (float32)
+        cv2.Sobel(blurred, cv2.CV_32F, 1, 0, dst=buffers['grad_x'], ksize=3)
+        cv2.Sobel(blurred, cv2.CV_32F, 0, 1, dst=buffers['grad_y'], ksize=3)
+        cv2.magnitude(buffers['grad_x'], buffers['grad_y'], magnitude=buffers['magnitude'])
+        if self.global_stats is not None:
+            max_magnitude = self.global_stats['sobel_max']
+        else:
+            _, max_magnitude, _, _ = cv2.minMaxLoc(buffers['magnitude'])
+        # 기존 np.uint8() 변환의 버림(truncation)과 맞추기 위해 0.5를 빼고 반올림
+        alpha = 255.0 / max_magnitude if max_magnitude > 0 else 0.0
+        cv2.convertScaleAbs(buffers['magnitude'], dst=buffers['sobel'], alpha=alpha, beta=-0.5)
         
-        # 임계값 적용으로 이진화
-        _, enhanced = cv2.threshold(enhanced, 50, 255, cv2.THRESH_BINARY)
+        # Laplacian (int16)
+        cv2.Laplacian(blurred, cv2.CV_16S, dst=buffers['laplacian_16s'])
+        cv2.convertScaleAbs(buffers['laplacian_16s'], dst=buffers['laplacian'])
         
-        return enhanced
+        # 가중 평균으로 결합 후 블러 + 이진화
+        combined = buffers['combined']
+        cv2.addWeighted(buffers['canny'], 0.5, buffers['sobel'], 0.3, 0, dst=combined)
+        cv2.addWeighted(combined, 0.8, buffers['laplacian'], 0.2, 0, dst=combined)
+        cv2.GaussianBlur(combined, (3, 3), 0, dst=out)
+        cv2.threshold(out, 50, 255, cv2.THRESH_BINARY, dst=out)
+        
+        return out
+    
+    def _get_fused_buffers(self, shape):
+        """융합 구현에서 사용할 버퍼를 이미지 크기별로 한 번만 할당합니다."""
+        buffers = self._fused_buffers
+        if buffers is None or buffers['out'].shape != shape:
+            buffers = {
+                'canny': np.empty(shape, dtype=np.uint8),
+                'grad_x': np.empty(shape, dtype=np.float32),
+                'grad_y': np.empty(shape, dtype=np.float32),
+                'magnitude': np.empty(shape, dtype=np.float32),
+                'sobel': np.empty(shape, dtype=np.uint8),
+                'laplacian_16s': np.empty(shape, dtype=np.int16),
+                'laplacian': np.empty(shape, dtype=np.uint8),
+                'combined': np.empty(shape, dtype=np.uint8),
+                'out': np.empty(shape, dtype=np.uint8),
+            }
+            self._fused_buffers = buffers
+        return buffers
     
-    def save_edge_detection_results(self):
-        """모든 에지 검출 방법의 결과를 저장합니다."""
+    def grayscale_image(self, image):
+        """
+        비교용 원본 그레이스케일 이미지
+        Returns:
+            그레이스케일 이미지
+        """
+        return self.compute('gray', image)
+    
+    def compute_methods(self, method_names=None):
+        """
+        요청한 에지 검출 방법만 계산합니다.
+        Args:
+            method_names: 계산할 방법 이름 리스트 (None이면 전체, method_labels() 참고)
+        Returns:
+            {방법 이름: 결과 이미지} 딕셔너리 (등록 순서)
+        """
         if self.image is None:
             self.load_image()
         
-        # 다양한 에지 검출 방법 적용
-        methods = {
-            'Original': cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY),
-            'Canny': self.canny_edge_detection(self.image),
-            'Adaptive Canny': self.adaptive_canny_edge_detection(self.image),
-            'Sobel': self.sobel_edge_detection(self.image),
-            'Laplacian': self.laplacian_edge_detection(self.image),
-            'Morphological': self.morphological_edge_detection(self.image),
-            'Enhanced': self.enhanced_edge_detection(self.image)
-        }
+        labels = self.method_labels()
+        if method_names is None:
+            method_names = list(labels)
+        
+        unknown = [name for name in method_names if name not in labels]
+        if unknown:
+            raise ValueError(f"알 수 없는 에지 검출 방법: {unknown} (사용 가능: {list(labels)})")
+        
+        # 요청한 노드와 그 입력만 계산되며, 공유 노드는 한 번만 계산됨
+        return {label: self.compute(node, self.image)
+                for label, node in labels.items() if label in method_names}
+    
+    def save_edge_detection_results(self, method_names=None, comparison='figure', show=True):
+        """
+        에지 검출 결과를 저장합니다.
+        Args:
+            method_names: 계산할 방법 이름 리스트 (None이면 전체).
+                메인 결과로 저장되는 'Enhanced'는 항상 포함됩니다.
+            comparison: 비교 결과 저장 방식
+                'figure' - matplotlib 그림 (기본값)
+                'mosaic' - NumPy 타일링 + cv2.imwrite (matplotlib 미사용, 헤드리스용)
+                None - 비교 결과를 저장하지 않음
+            show (bool): 'figure' 방식에서 plt.show()로 화면에 표시할지 여부
+        Returns:
+            {방법 이름: 결과 이미지} 딕셔너리
+        """
+        if method_names is not None and 'Enhanced' not in method_names:
+            method_names = list(method_names) + ['Enhanced']
+        
+        # 요청한 에지 검출 방법만 적용
+        methods = self.compute_methods(method_names)
+        
+        # 비교 결과 저장
+        stem, ext = os.path.splitext(self.output_path)
+        comparison_path = f"{stem}_comparison{ext}"
+        if comparison == 'figure':
+            self._save_comparison_figure(methods, comparison_path, show)
+        elif comparison == 'mosaic':
+            self._save_comparison_mosaic(methods, comparison_path)
+        elif comparison is not None:
+            raise ValueError(f"알 수 없는 비교 결과 저장 방식: {comparison}")
+        
+        # 최고 품질의 결과 (Enhanced) 저장
+        cv2.imwrite(self.output_path, methods['Enhanced'])
+        
+        if self.verbose:
+            print(f"에지 검출 완료!")
+            print(f"메인 결과 저장: {self.output_path}")
+            if comparison is not None:
+                print(f"비교 결과 저장: {comparison_path}")
+        
+        return methods
+    
+    def _save_comparison_figure(self, methods, comparison_path, show=True):
+        """matplotlib으로 비교 그림을 만들어 저장합니다."""
+        # 헤드리스 실행 시 matplotlib 로딩 비용을 피하기 위해 필요할 때만 import
+        import matplotlib.pyplot as plt
         
         # 결과 시각화
-        fig, axes = plt.subplots(2, 4, figsize=(20, 10))
+        # 사용자 정의 방법이 등록되면 행을 늘림 (기본 7개는 2x4)
+        rows = max(2, -(-len(methods) // 4))
+        fig, axes = plt.subplots(rows, 4, figsize=(20, 5 * rows))
         axes = axes.ravel()
         
         for i, (method_name, result) in enumerate(methods.items()):
@@ -178,48 +491,860 @@ class EdgeDetector:
             axes[i].set_title(f'{method_name} Edge Detection', fontsize=12)
             axes[i].axis('off')
         
-        # 마지막 subplot 숨기기
-        axes[7].axis('off')
+        # 남은 subplot 숨기기
+        for ax in axes[len(methods):]:
+            ax.axis('off')
         
         plt.tight_layout()
-        
-        # 비교 결과 저장
-        comparison_path = self.output_path.replace('.jpg', '_comparison.jpg')
         plt.savefig(comparison_path, dpi=300, bbox_inches='tight')
-        plt.show()
+        if show:
+            plt.show()
+        plt.close(fig)
+    
+    def _save_comparison_mosaic(self, methods, comparison_path, columns=4):
+        """
+        결과 이미지를 NumPy로 격자 배치하여 한 번의 cv2.imwrite로 저장합니다.
+        """
+        height, width = next(iter(methods.values())).shape[:2]
+        rows = -(-len(methods) // columns)
         
-        # 최고 품질의 결과 (Enhanced) 저장
-        cv2.imwrite(self.output_path, methods['Enhanced'])
+        # 각 타일 위에 방법 이름을 쓸 제목 띠
+        font_scale = max(0.5, width / 640)
+        label_height = int(30 * font_scale)
+        cell_height = height + label_height
         
-        print(f"에지 검출 완료!")
-        print(f"메인 결과 저장: {self.output_path}")
-        print(f"비교 결과 저장: {comparison_path}")
+        mosaic = np.zeros((rows * cell_height, columns * width), dtype=np.uint8)
+        for i, (method_name, result) in enumerate(methods.items()):
+            y = (i // columns) * cell_height
+            x = (i % columns) * width
+            mosaic[y + label_height:y + cell_height, x:x + width] = result
+            cv2.putText(mosaic, method_name, (x + 5, y + label_height - int(8 * font_scale)),
+                        cv2.FONT_HERSHEY_SIMPLEX, font_scale, 255, max(1, int(font_scale * 2)))
         
-        return methods
+        cv2.imwrite(comparison_path, mosaic)
     
-    def process(self):
-        """전체 에지 검출 프로세스를 실행합니다."""
+    def process(self, method_names=None, comparison='figure', show=True):
+        """
+        전체 에지 검출 프로세스를 실행합니다.
+        Args:
+            method_names, comparison, show: save_edge_detection_results() 참고
+        """
         print("=== AI 기반 에지 검출 시작 ===")
         
         # 이미지 로드
         self.load_image()
         
         # 에지 검출 및 결과 저장
-        results = self.save_edge_detection_results()
+        results = self.save_edge_detection_results(method_names, comparison, show)
         
         print("=== 에지 검출 완료 ===")
         return results
+    
+    def stream_edge_detection(self, source, method='canny', output_path=None, prefetch=4,
+                              threshold_interval=1, threshold_smoothing=0.0):
+        """
+        비디오 파일 또는 카메라 스트림의 프레임마다 에지를 검출합니다. (제너레이터)
+        
+        읽기 스레드가 프레임을 미리 디코딩해 두고, 프레임/그레이/블러/에지 버퍼는
+        처음 한 번만 할당하여 모든 프레임에서 재사용합니다.
+        Args:
+            source: 비디오 파일 경로 또는 카메라 번호
+            method: 'canny', 'adaptive_canny', 'enhanced' 중 하나
+            output_path (str): 결과 비디오 저장 경로 (None이면 저장하지 않음)
+            prefetch (int): 미리 읽어 둘 최대 프레임 수
+            threshold_interval (int): 적응형 임계값용 중간값을 N 프레임마다 다시 계산
+            threshold_smoothing (float): 중간값 지수 이동 평균에서 이전 값의 가중치
+                (0이면 현재 프레임 값만 사용, 0.9이면 천천히 변화하여 깜빡임 감소)
+        Yields:
+            에지 맵 (재사용되는 버퍼이므로 보관하려면 복사해야 함)
+        """
+        if method not in self.STREAM_METHODS:
+            raise ValueError(f"스트리밍에서 지원하지 않는 방법: {method} (사용 가능: {self.STREAM_METHODS})")
+        if threshold_interval < 1:
+            raise ValueError(f"threshold_interval은 1 이상이어야 합니다: {threshold_interval}")
+        
+        capture = cv2.VideoCapture(source)
+        if not capture.isOpened():
+            raise ValueError(f"비디오를 열 수 없습니다: {source}")
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        
+        ready = queue.Queue(maxsize=prefetch)
+        free = queue.Queue()
+        stop = threading.Event()
+        reader = threading.Thread(target=self._stream_reader,
+                                  args=(capture, ready, free, stop, prefetch + 2), daemon=True)
+        reader.start()
+        
+        stats = {'frames': 0, 'read': 0.0, 'preprocess': 0.0, 'edges': 0.0, 'write': 0.0}
+        writer = None
+        gray = blurred = edges = None
+        median = None
+        start = time.perf_counter()
+        try:
+            while True:
+                t0 = time.perf_counter()
+                frame = ready.get()
+                if frame is None:
+                    break
+                t1 = time.perf_counter()
+                
+                # 해상도가 바뀔 때만 버퍼를 다시 할당
+                if gray is None or gray.shape != frame.shape[:2]:
+                    gray = np.empty(frame.shape[:2], dtype=np.uint8)
+                    blurred = np.empty_like(gray)
+                    edges = np.empty_like(gray)
+                
+                # 같은 버퍼를 재사용하므로 이전 프레임의 캐시를 비우고 블러 결과를 버퍼에 기록
+                self.invalidate_cache()
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+                self._cached(gray, 'blurred',
+                             lambda: cv2.GaussianBlur(gray, self.blur_ksize, self.blur_sigma, dst=blurred))
+                free.put(frame)
+                
+                # 임계값 중간값을 N 프레임마다 갱신하고 시간 축으로 평활화
+                if method != 'canny':
+                    if median is None or stats['frames'] % threshold_interval == 0:
+                        current = self._compute_median(blurred)
+                        if median is None:
+                            median = current
+                        else:
+                            median = threshold_smoothing * median + (1.0 - threshold_smoothing) * current
+                    self._cached(gray, 'median', lambda: median)
+                t2 = time.perf_counter()
+                
+                if method == 'canny':
+                    cv2.Canny(blurred, 50, 150, edges=edges)
+                elif method == 'adaptive_canny':
+                    low_threshold, high_threshold = self._adaptive_thresholds(gray)
+                    cv2.Canny(blurred, low_threshold, high_threshold, edges=edges)
+                else:
+                    self.enhanced_edge_detection_fused(gray, out=edges)
+                t3 = time.perf_counter()
+                
+                if output_path is not None:
+                    if writer is None:
+                        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+                        writer = cv2.VideoWriter(output_path, fourcc, fps,
+                                                 (edges.shape[1], edges.shape[0]), False)
+                    writer.write(edges)
+                t4 = time.perf_counter()
+                
+                stats['frames'] += 1
+                stats['read'] += t1 - t0
+                stats['preprocess'] += t2 - t1
+                stats['edges'] += t3 - t2
+                stats['write'] += t4 - t3
+                
+                yield edges
+        finally:
+            stop.set()
+            # 읽기 스레드가 대기 중인 큐를 비운 뒤 종료를 기다림
+            while True:
+                try:
+                    ready.get_nowait()
+                except queue.Empty:
+                    break
+            reader.join()
+            capture.release()
+            if writer is not None:
+                writer.release()
+            
+            elapsed = time.perf_counter() - start
+            frames = stats['frames']
+            self.stream_stats = {
+                'frames': frames,
+                'fps': frames / elapsed if elapsed > 0 else 0.0,
+                # 단계별 프레임당 평균 지연 시간 (ms)
+                'latency_ms': {stage: stats[stage] / frames * 1000 if frames else 0.0
+                               for stage in ('read', 'preprocess', 'edges', 'write')},
+            }
+            if self.verbose:
+                latency = ', '.join(f"{stage}={value:.2f}ms"
+                                    for stage, value in self.stream_stats['latency_ms'].items())
+                print(f"스트리밍 완료: {frames} 프레임, {self.stream_stats['fps']:.1f} FPS ({latency})")
+    
+    @staticmethod
+    def _stream_reader(capture, ready, free, stop, max_buffers):
+        """
+        읽기 스레드: 반환된 프레임 버퍼를 재사용하여 프레임을 미리 디코딩합니다.
+        할당하는 프레임 버퍼는 최대 max_buffers 개입니다.
+        """
+        allocated = 0
+        while not stop.is_set():
+            try:
+                buffer = free.get_nowait()
+            except queue.Empty:
+                if allocated < max_buffers:
+                    buffer = None
+                    allocated += 1
+                else:
+                    try:
+                        buffer = free.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+            
+            ok, frame = capture.read(buffer) if buffer is not None else capture.read()
+            if not ok:
+                break
+            
+            while not stop.is_set():
+                try:
+                    ready.put(frame, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+        
+        # 스트림 종료 알림 (소비자가 먼저 멈추면 큐가 가득 차 있을 수 있으므로 stop을 확인하며 대기)
+        while not stop.is_set():
+            try:
+                ready.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+    
+    def tiled_edge_detection(self, method_name='Enhanced', tile_size=1024, halo=None,
+                             workers=1, output_path=None):
+        """
+        초대형 이미지를 겹치는 타일 단위로 처리하여 메모리 사용량을 제한합니다.
+        
+        입력은 그레이스케일(픽셀당 1바이트)로 처리하며, 타일마다 가장 큰 커널 반경
+        이상의 여백(halo)을 붙여 계산한 뒤 가운데 영역만 결과에 씁니다.
+        중간값과 Sobel 최대값은 먼저 타일을 한 번 훑어 이미지 전체 기준으로 구하므로
+        지역 연산 결과는 전체 이미지 처리와 동일합니다.
+        (Canny의 히스테리시스 연결은 여백 밖까지 이어질 수 있어 경계 근처에서
+        드물게 차이가 날 수 있습니다.)
+        
+        .npy가 아닌 입력은 전체 이미지(컬러)를 메모리로 디코딩한 뒤 compute()와 같은
+        cvtColor 변환으로 그레이스케일로 바꿉니다. 입력/출력 경로가 모두 .npy일 때만
+        메모리 맵으로 읽고 타일을 파일에 바로 기록하므로, 이미지 크기와 관계없이
+        메모리 사용량이 타일 크기에 비례합니다.
+        Args:
+            method_name: 적용할 방법 이름 (method_labels() 참고, 'Original' 제외)
+            tile_size (int): 타일 한 변의 크기 (여백 제외)
+            halo (int): 타일 여백 크기 (None이면 커널 크기로 자동 계산)
+            workers (int): 타일을 병렬 처리할 스레드 수 (OpenCV는 GIL을 해제함)
+            output_path (str): 결과 저장 경로 (None이면 self.output_path)
+        Returns:
+            결과 이미지 (.npy 출력이면 메모리 맵 배열)
+        """
+        labels = self.method_labels()
+        if method_name not in labels or method_name == 'Original':
+            raise ValueError(f"타일 처리할 수 없는 에지 검출 방법: {method_name}")
+        node = labels[method_name]
+        
+        if halo is None:
+            halo = self._tile_halo()
+        output_path = output_path or self.output_path
+        
+        image = self._open_tiled_input()
+        height, width = image.shape[:2]
+        tiles = list(self._iter_tiles(height, width, tile_size, halo))
+        
+        if self.verbose:
+            print(f"타일 에지 검출 시작: {width}x{height}, 타일 {len(tiles)}개 "
+                  f"(크기 {tile_size}, 여백 {halo}), 스레드 {workers}개")
+        
+        # 1단계: 전체 이미지 기준 통계 (필요한 방법만)
+        global_stats = None
+        if self._depends_on(node, ('median', 'sobel_magnitude')):
+            global_stats = self._tiled_global_stats(image, tiles, workers)
+            if self.verbose:
+                print(f"전체 통계: 중간값={global_stats['median']}, "
+                      f"Sobel 최대값={global_stats['sobel_max']:.1f}")
+        
+        # 2단계: 타일별 에지 검출 후 결과에 기록
+        if output_path is not None and output_path.endswith('.npy'):
+            result = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.uint8,
+                                               shape=(height, width))
+        else:
+            result = np.empty((height, width), dtype=np.uint8)
+        
+        def detect_tile(tile):
+            detector = self._tile_detector(global_stats)
+            (y0, y1, x0, x1), (hy0, hy1, hx0, hx1) = tile
+            # 메모리 맵 입력에서도 타일 부분만 읽도록 복사
+            region = np.ascontiguousarray(image[hy0:hy1, hx0:hx1])
+            edges = detector.compute(node, region)
+            return tile, edges[y0 - hy0:y1 - hy0, x0 - hx0:x1 - hx0]
+        
+        for tile, edges in self._map_tiles(detect_tile, tiles, workers):
+            (y0, y1, x0, x1), _ = tile
+            result[y0:y1, x0:x1] = edges
+        
+        if isinstance(result, np.memmap):
+            result.flush()
+        elif output_path is not None:
+            cv2.imwrite(output_path, result)
+        
+        if self.verbose and output_path is not None:
+            print(f"타일 에지 검출 완료: {output_path}")
+        
+        return result
+    
+    def _tile_halo(self):
+        """
+        타일 여백 크기: 블러 반경 + Sobel/Laplacian/NMS/후처리 블러 반경
+        + Canny 히스테리시스 연결을 위한 여유분
+        """
+        blur_radius = max(self.blur_ksize) // 2
+        return blur_radius + 4 + 16
+    
+    def _tile_detector(self, global_stats):
+        """타일마다 독립된 캐시를 쓰는 검출기를 만듭니다. (스레드 안전)"""
+        # 하위 클래스에 등록된 방법과 중간값 설정을 그대로 쓰도록 같은 클래스로 생성
+        detector = type(self)(None, None, self.blur_ksize, self.blur_sigma, verbose=False,
+                              median_method=self.median_method, median_subsample=self.median_subsample)
+        detector.global_stats = global_stats
+        return detector
+    
+    def _open_tiled_input(self):
+        """타일 처리용 입력을 엽니다. (.npy는 메모리 맵, 그 외는 전체 디코딩 후 그레이스케일 변환)"""
+        if not os.path.exists(self.input_path):
+            raise FileNotFoundError(f"입력 이미지를 찾을 수 없습니다: {self.input_path}")
+        
+        if self.input_path.endswith('.npy'):
+            image = np.load(self.input_path, mmap_mode='r')
+        else:
+            # IMREAD_GRAYSCALE은 cvtColor와 결과가 달라 전체 이미지 처리와 어긋나므로
+            # 컬러로 읽고 compute()의 그레이 노드와 같은 방식으로 변환
+            image = cv2.imread(self.input_path)
+            if image is not None:
+                image = _node_gray(self, image)
+        if image is None:
+            raise ValueError("이미지를 읽을 수 없습니다.")
+        return image
+    
+    @staticmethod
+    def _iter_tiles(height, width, tile_size, halo):
+        """
+        타일 좌표를 생성합니다.
+        Yields:
+            ((y0, y1, x0, x1) 결과 영역, (hy0, hy1, hx0, hx1) 여백 포함 영역)
+        """
+        for y0 in range(0, height, tile_size):
+            y1 = min(y0 + tile_size, height)
+            for x0 in range(0, width, tile_size):
+                x1 = min(x0 + tile_size, width)
+                yield ((y0, y1, x0, x1),
+                       (max(0, y0 - halo), min(height, y1 + halo),
+                        max(0, x0 - halo), min(width, x1 + halo)))
+    
+    @staticmethod
+    def _map_tiles(func, tiles, workers):
+        """
+        타일을 순서대로 처리합니다. 동시에 처리 중인 타일 수를 제한하여
+        결과가 쌓이지 않도록 합니다.
+        """
+        if workers <= 1:
+            for tile in tiles:
+                yield func(tile)
+            return
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for tile in tiles:
+                pending.append(executor.submit(func, tile))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def _tiled_global_stats(self, image, tiles, workers):
+        """타일을 훑어 블러 이미지의 중간값과 Sobel 최대값을 계산합니다."""
+        def tile_stats(tile):
+            detector = self._tile_detector(None)
+            (y0, y1, x0, x1), (hy0, hy1, hx0, hx1) = tile
+            region = np.ascontiguousarray(image[hy0:hy1, hx0:hx1])
+            gray, blurred = detector.preprocess_image(region)
+            core = (slice(y0 - hy0, y1 - hy0), slice(x0 - hx0, x1 - hx0))
+            hist = cv2.calcHist([np.ascontiguousarray(blurred[core])], [0], None, [256], [0, 256])
+            sobel_max = detector._sobel_magnitude(region)[core].max()
+            return hist, sobel_max
+        
+        total_hist = np.zeros(256, dtype=np.float64)
+        sobel_max = 0.0
+        for hist, tile_max in self._map_tiles(tile_stats, tiles, workers):
+            total_hist += hist.ravel()
+            sobel_max = max(sobel_max, float(tile_max))
+        
+        return {'median': histogram_median(total_hist), 'sobel_max': sobel_max}
+
+def _node_gray(detector, image):
+    # 이미 그레이스케일이면 그대로 사용
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+def _node_blurred(detector, gray):
+    # 가우시안 블러를 적용하여 노이즈 제거
+    return cv2.GaussianBlur(gray, detector.blur_ksize, detector.blur_sigma)
+
+def _node_median(detector, blurred):
+    # 타일 처리 중이면 이미지 전체 기준 중간값 사용
+    if detector.global_stats is not None:
+        return detector.global_stats['median']
+    return detector._compute_median(blurred)
+
+def _node_canny(detector, blurred, low_threshold=50, high_threshold=150):
+    return cv2.Canny(blurred, low_threshold, high_threshold)
+
+def _node_adaptive_canny(detector, blurred, median, sigma=0.33):
+    # 중간값을 기반으로 자동 임계값 계산
+    low_threshold, high_threshold = adaptive_thresholds(median, sigma)
+    if detector.verbose:
+        print(f"자동 계산된 임계값: Low={low_threshold}, High={high_threshold}")
+    return cv2.Canny(blurred, low_threshold, high_threshold)
+
+def _node_sobel_magnitude(detector, sobel_x, sobel_y):
+    return np.sqrt(sobel_x**2 + sobel_y**2)
+
+def _node_sobel(detector, sobel_magnitude):
+    return np.uint8(sobel_magnitude / detector._sobel_max(sobel_magnitude) * 255)
+
+def _node_laplacian(detector, blurred):
+    laplacian = cv2.Laplacian(blurred, cv2.CV_64F)
+    return np.uint8(np.absolute(laplacian))
+
+def _node_morphological(detector, blurred):
+    # 형태학적 그래디언트
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    return cv2.morphologyEx(blurred, cv2.MORPH_GRADIENT, kernel)
+
+def _node_enhanced(detector, canny_edges, sobel_edges, laplacian_edges):
+    # 가중 평균으로 결합
+    combined = cv2.addWeighted(canny_edges, 0.5, sobel_edges, 0.3, 0)
+    combined = cv2.addWeighted(combined, 0.8, laplacian_edges, 0.2, 0)
+    
+    # 결과 향상을 위한 후처리
+    # 가우시안 블러로 부드럽게 처리
+    enhanced = cv2.GaussianBlur(combined, (3, 3), 0)
+    
+    # 임계값 적용으로 이진화
+    _, enhanced = cv2.threshold(enhanced, 50, 255, cv2.THRESH_BINARY)
+    
+    return enhanced
+
+# 기본 노드 등록 (label이 있는 노드는 등록 순서대로 비교 결과에 표시됨)
+EdgeDetector.register_method('gray', _node_gray, inputs=('image',), label='Original')
+EdgeDetector.register_method('blurred', _node_blurred, inputs=('gray',))
+EdgeDetector.register_method('median', _node_median)
+EdgeDetector.register_method('sobel_x', lambda d, blurred: cv2.Sobel(blurred, cv2.CV_64F, 1, 0, ksize=3))
+EdgeDetector.register_method('sobel_y', lambda d, blurred: cv2.Sobel(blurred, cv2.CV_64F, 0, 1, ksize=3))
+EdgeDetector.register_method('sobel_magnitude', _node_sobel_magnitude, inputs=('sobel_x', 'sobel_y'))
+EdgeDetector.register_method('canny', _node_canny, label='Canny')
+EdgeDetector.register_method('adaptive_canny', _node_adaptive_canny, inputs=('blurred', 'median'),
+                             label='Adaptive Canny')
+EdgeDetector.register_method('sobel', _node_sobel, inputs=('sobel_magnitude',), label='Sobel')
+EdgeDetector.register_method('laplacian', _node_laplacian, label='Laplacian')
+EdgeDetector.register_method('morphological', _node_morphological, label='Morphological')
+EdgeDetector.register_method('enhanced', _node_enhanced, inputs=('adaptive_canny', 'sobel', 'laplacian'),
+                             label='Enhanced')
+
+def collect_image_paths(inputs):
+    """
+    디렉토리, glob 패턴, 파일 목록에서 처리할 이미지 경로를 수집합니다.
+    Args:
+        inputs: 디렉토리 경로, glob 패턴 또는 파일 경로 (문자열 또는 리스트)
+    Returns:
+        정렬되고 중복이 제거된 이미지 경로 리스트
+    """
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for name in os.listdir(item):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.join(item, name))
+        elif glob.has_magic(item):
+            paths.extend(p for p in glob.glob(item, recursive=True)
+                         if p.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            paths.append(item)
+    
+    return sorted(set(paths))
+
+def available_cpu_count():
+    """현재 프로세스가 사용할 수 있는 CPU 코어 수를 반환합니다."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def _write_image_atomic(output_path, image, params=None):
+    """
+    임시 파일에 인코딩한 뒤 이름을 바꿔 저장합니다.
+    작업이 중단되어도 불완전한 결과 파일이 남지 않아 재개 시 안전하게 건너뛸 수 있습니다.
+    Args:
+        params: cv2.imencode 인코딩 파라미터 (예: [cv2.IMWRITE_JPEG_QUALITY, 90])
+    """
+    ext = os.path.splitext(output_path)[1]
+    success, encoded = cv2.imencode(ext, image, params or [])
+    if not success:
+        raise IOError(f"결과를 저장할 수 없습니다: {output_path}")
+    
+    temp_path = output_path + '.partial'
+    with open(temp_path, 'wb') as f:
+        f.write(encoded.tobytes())
+    os.replace(temp_path, output_path)
+
+def _plan_batch_jobs(inputs, output_dir, skip_existing=True, output_ext=None):
+    """
+    입력 이미지마다 출력 경로를 정하고, 이미 결과가 있는 이미지는 건너뜁니다.
+    Returns:
+        ([(입력 경로, 출력 경로), ...], 건너뛴 개수)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    
+    jobs = []
+    skipped = 0
+    for input_path in collect_image_paths(inputs):
+        stem, ext = os.path.splitext(os.path.basename(input_path))
+        output_path = os.path.join(output_dir, stem + (output_ext or ext))
+        if skip_existing and os.path.exists(output_path):
+            skipped += 1
+            continue
+        jobs.append((input_path, output_path))
+    
+    return jobs, skipped
+
+def _batch_worker_init():
+    """작업 프로세스 초기화 - 프로세스 간 OpenCV 스레드 경쟁을 막습니다."""
+    cv2.setNumThreads(1)
+
+def _batch_worker(job):
+    """
+    배치 모드의 작업 프로세스에서 이미지 한 장을 처리합니다.
+    Returns:
+        (입력 경로, 출력 경로, 처리 시간(초), 에러 메시지 또는 None)
+    """
+    input_path, output_path, median_method = job
+    start = time.perf_counter()
+    try:
+        detector = EdgeDetector(input_path, output_path, verbose=False, median_method=median_method)
+        detector.load_image()
+        enhanced = detector.enhanced_edge_detection(detector.image)
+        _write_image_atomic(output_path, enhanced)
+        error = None
+    except Exception as e:
+        error = str(e)
+    return input_path, output_path, time.perf_counter() - start, error
+
+def batch_process(inputs, output_dir, workers=None, skip_existing=True, output_ext=None,
+                  median_method='exact'):
+    """
+    여러 이미지에 Enhanced 에지 검출을 프로세스 풀로 병렬 적용합니다.
+    Args:
+        inputs: 디렉토리, glob 패턴 또는 파일 목록
+        output_dir (str): 결과를 저장할 디렉토리
+        workers (int): 작업 프로세스 수 (None이면 사용 가능한 코어 수)
+        skip_existing (bool): 결과가 이미 있는 이미지는 건너뜀 (중단된 작업 재개용)
+        output_ext (str): 출력 확장자 (예: '.png', None이면 입력과 동일)
+        median_method (str): 적응형 Canny 임계값의 중간값 계산 방식
+    Returns:
+        처리 통계 딕셔너리
+    """
+    if median_method not in EdgeDetector.MEDIAN_METHODS:
+        raise ValueError(f"알 수 없는 중간값 계산 방식: {median_method} (사용 가능: {EdgeDetector.MEDIAN_METHODS})")
+    jobs, skipped = _plan_batch_jobs(inputs, output_dir, skip_existing, output_ext)
+    
+    workers = workers or available_cpu_count()
+    workers = max(1, min(workers, len(jobs) or 1))
+    print(f"배치 에지 검출 시작: {len(jobs)}개 처리, {skipped}개 건너뜀, 작업 프로세스 {workers}개")
+    
+    done = 0
+    failed = 0
+    start = time.perf_counter()
+    if jobs:
+        # 작업 단위를 묶어 프로세스 간 통신 오버헤드를 줄임
+        chunksize = max(1, min(16, len(jobs) // (workers * 4)))
+        with multiprocessing.Pool(workers, initializer=_batch_worker_init) as pool:
+            # 완료되는 순서대로 결과를 받아 바로 출력
+            for input_path, output_path, elapsed, error in pool.imap_unordered(
+                    _batch_worker, [job + (median_method,) for job in jobs], chunksize=chunksize):
+                if error is None:
+                    done += 1
+                    print(f"[{done + failed}/{len(jobs)}] {os.path.basename(input_path)}: {elapsed * 1000:.1f} ms")
+                else:
+                    failed += 1
+                    print(f"[{done + failed}/{len(jobs)}] {os.path.basename(input_path)}: 실패 ({error})")
+    total_time = time.perf_counter() - start
+    
+    throughput = done / total_time if total_time > 0 else 0.0
+    print(f"배치 완료: 성공 {done}, 실패 {failed}, 건너뜀 {skipped}, "
+          f"총 {total_time:.2f}초, 처리량 {throughput:.2f} images/sec")
+    
+    return {
+        'processed': done,
+        'failed': failed,
+        'skipped': skipped,
+        'total_time': total_time,
+        'images_per_sec': throughput,
+    }
+
+# 축소 디코딩 배율별 cv2.imread 플래그
+REDUCED_READ_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+def encode_params(output_path, jpeg_quality=95, png_compression=3):
+    """출력 확장자에 맞는 cv2.imencode 파라미터를 만듭니다."""
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext in ('.jpg', '.jpeg'):
+        return [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]
+    if ext == '.png':
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(png_compression)]
+    return []
+
+def pipeline_process(inputs, output_dir, method_name='Enhanced', readers=2, writers=2,
+                     queue_size=8, reduced=1, jpeg_quality=95, png_compression=3,
+                     skip_existing=True, output_ext=None, detector_class=None, median_method='exact'):
+    """
+    디코딩 / 에지 검출 / 인코딩을 세 단계 파이프라인으로 겹쳐 실행합니다.
+    
+    읽기 스레드 풀이 이미지를 미리 디코딩하고, 계산 단계가 에지를 검출하는 동안
+    쓰기 스레드 풀이 이전 결과를 인코딩/저장합니다. (OpenCV 입출력은 GIL을 해제함)
+    단계 사이의 큐는 크기가 제한되어 있어 입력 개수와 관계없이 메모리가 일정합니다.
+    Args:
+        inputs: 디렉토리, glob 패턴 또는 파일 목록
+        output_dir (str): 결과를 저장할 디렉토리
+        method_name: 저장할 방법 이름 (method_labels() 참고)
+        readers (int): 디코딩 스레드 수
+        writers (int): 인코딩/저장 스레드 수
+        queue_size (int): 단계 사이 큐의 최대 이미지 수
+        reduced (int): 축소 디코딩 배율 (1, 2, 4, 8 - cv2.IMREAD_REDUCED_*)
+        jpeg_quality (int): JPEG 품질 (0~100)
+        png_compression (int): PNG 압축 수준 (0~9)
+        skip_existing (bool): 결과가 이미 있는 이미지는 건너뜀
+        output_ext (str): 출력 확장자 (None이면 입력과 동일)
+        detector_class: 검출기 클래스 (None이면 EdgeDetector, 하위 클래스에 등록한 방법을 쓸 때 지정)
+        median_method (str): 적응형 Canny 임계값의 중간값 계산 방식
+    Returns:
+        처리 통계 딕셔너리
+    """
+    detector_class = detector_class or EdgeDetector
+    labels = detector_class.method_labels()
+    if method_name not in labels:
+        raise ValueError(f"알 수 없는 에지 검출 방법: {method_name} (사용 가능: {list(labels)})")
+    if reduced not in REDUCED_READ_FLAGS:
+        raise ValueError(f"지원하지 않는 축소 배율: {reduced} (사용 가능: {list(REDUCED_READ_FLAGS)})")
+    for name, value in (('readers', readers), ('writers', writers), ('queue_size', queue_size)):
+        if value < 1:
+            raise ValueError(f"{name}는 1 이상이어야 합니다: {value}")
+    
+    jobs, skipped = _plan_batch_jobs(inputs, output_dir, skip_existing, output_ext)
+    print(f"파이프라인 에지 검출 시작: {len(jobs)}개 처리, {skipped}개 건너뜀, "
+          f"읽기 {readers} / 쓰기 {writers} 스레드, 큐 {queue_size}")
+    
+    pending = queue.Queue()
+    for job in jobs:
+        pending.put(job)
+    decoded = queue.Queue(maxsize=queue_size)
+    encoded = queue.Queue(maxsize=queue_size)
+    stats = {'read': 0.0, 'compute': 0.0, 'write': 0.0, 'done': 0, 'failed': 0}
+    lock = threading.Lock()
+    read_flag = REDUCED_READ_FLAGS[reduced]
+    
+    def read_stage():
+        while True:
+            try:
+                input_path, output_path = pending.get_nowait()
+            except queue.Empty:
+                break
+            start = time.perf_counter()
+            image = cv2.imread(input_path, read_flag)
+            with lock:
+                stats['read'] += time.perf_counter() - start
+            decoded.put((input_path, output_path, image))
+        decoded.put(None)
+    
+    def write_stage():
+        while True:
+            item = encoded.get()
+            if item is None:
+                break
+            input_path, output_path, edges = item
+            start = time.perf_counter()
+            try:
+                _write_image_atomic(output_path, edges,
+                                    encode_params(output_path, jpeg_quality, png_compression))
+                ok = True
+            except Exception as e:
+                print(f"{os.path.basename(input_path)}: 저장 실패 ({e})")
+                ok = False
+            with lock:
+                stats['write'] += time.perf_counter() - start
+                stats['done' if ok else 'failed'] += 1
+    
+    read_threads = [threading.Thread(target=read_stage, daemon=True) for _ in range(readers)]
+    write_threads = [threading.Thread(target=write_stage, daemon=True) for _ in range(writers)]
+    start = time.perf_counter()
+    for thread in read_threads + write_threads:
+        thread.start()
+    
+    # 계산 단계 (현재 스레드) - 검출기 하나를 재사용하고 이미지마다 캐시를 갱신
+    detector = detector_class(None, None, verbose=False, median_method=median_method)
+    node = labels[method_name]
+    finished_readers = 0
+    try:
+        while finished_readers < readers:
+            item = decoded.get()
+            if item is None:
+                finished_readers += 1
+                continue
+            
+            input_path, output_path, image = item
+            if image is None:
+                print(f"{os.path.basename(input_path)}: 이미지를 읽을 수 없습니다.")
+                with lock:
+                    stats['failed'] += 1
+                continue
+            
+            compute_start = time.perf_counter()
+            try:
+                detector.image = image
+                edges = detector.compute(node)
+            except Exception as e:
+                print(f"{os.path.basename(input_path)}: 에지 검출 실패 ({e})")
+                with lock:
+                    stats['failed'] += 1
+                continue
+            finally:
+                stats['compute'] += time.perf_counter() - compute_start
+            encoded.put((input_path, output_path, edges))
+    finally:
+        # 중간에 중단되어도 읽기 스레드가 끝나도록 남은 작업을 비우고 종료 표시까지 받아냄
+        while True:
+            try:
+                pending.get_nowait()
+            except queue.Empty:
+                break
+        while finished_readers < readers:
+            if decoded.get() is None:
+                finished_readers += 1
+        for _ in write_threads:
+            encoded.put(None)
+        for thread in read_threads + write_threads:
+            thread.join()
+    total_time = time.perf_counter() - start
+    
+    done = stats['done']
+    throughput = done / total_time if total_time > 0 else 0.0
+    per_image = {stage: stats[stage] / max(done, 1) * 1000 for stage in ('read', 'compute', 'write')}
+    print(f"파이프라인 완료: 성공 {done}, 실패 {stats['failed']}, 건너뜀 {skipped}, "
+          f"총 {total_time:.2f}초, 처리량 {throughput:.2f} images/sec")
+    print(f"단계별 평균 시간: 읽기 {per_image['read']:.1f} ms, 계산 {per_image['compute']:.1f} ms, "
+          f"쓰기 {per_image['write']:.1f} ms")
+    
+    return {
+        'processed': done,
+        'failed': stats['failed'],
+        'skipped': skipped,
+        'total_time': total_time,
+        'images_per_sec': throughput,
+        'stage_ms': per_image,
+    }
+
+def positive_int(value):
+    """1 이상의 정수만 허용하는 argparse 타입"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1 이상의 정수여야 합니다: {value}")
+    return number
+
+def parse_args():
+    """명령행 인자를 파싱합니다."""
+    parser = argparse.ArgumentParser(description="AI 기반 에지 검출")
+    parser.add_argument('--batch', nargs='+', metavar='INPUT',
+                        help="배치 모드 입력 (디렉토리, glob 패턴 또는 파일 목록)")
+    parser.add_argument('--output-dir', default='output',
+                        help="배치 모드 결과 디렉토리")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="배치 모드 작업 프로세스 수 (기본값: 사용 가능한 코어 수)")
+    parser.add_argument('--no-skip', action='store_true',
+                        help="이미 결과가 있는 이미지도 다시 처리")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="배치 모드를 디코딩/계산/인코딩이 겹치는 스레드 파이프라인으로 실행")
+    parser.add_argument('--readers', type=positive_int, default=2, help="파이프라인 디코딩 스레드 수")
+    parser.add_argument('--writers', type=positive_int, default=2, help="파이프라인 인코딩 스레드 수")
+    parser.add_argument('--queue-size', type=positive_int, default=8, help="파이프라인 단계 사이 큐 크기")
+    parser.add_argument('--reduced', type=int, default=1, choices=sorted(REDUCED_READ_FLAGS),
+                        help="파이프라인 축소 디코딩 배율")
+    parser.add_argument('--jpeg-quality', type=int, default=95, help="JPEG 저장 품질 (0~100)")
+    parser.add_argument('--png-compression', type=int, default=3, help="PNG 압축 수준 (0~9)")
+    parser.add_argument('--headless', action='store_true',
+                        help="matplotlib 없이 비교 모자이크만 저장하고 화면에 표시하지 않음")
+    parser.add_argument('--no-comparison', action='store_true',
+                        help="비교 결과를 저장하지 않음")
+    parser.add_argument('--video', metavar='SOURCE',
+                        help="비디오 파일 경로 또는 카메라 번호로 스트리밍 에지 검출")
+    parser.add_argument('--video-method', default='canny', choices=EdgeDetector.STREAM_METHODS,
+                        help="스트리밍 에지 검출 방법")
+    parser.add_argument('--video-output', default=None, help="스트리밍 결과 비디오 저장 경로")
+    parser.add_argument('--median-method', default='exact', choices=EdgeDetector.MEDIAN_METHODS,
+                        help="적응형 Canny 임계값의 중간값 계산 방식")
+    parser.add_argument('--threshold-interval', type=positive_int, default=1,
+                        help="스트리밍 시 임계값을 N 프레임마다 갱신")
+    parser.add_argument('--threshold-smoothing', type=float, default=0.0,
+                        help="스트리밍 시 임계값 지수 이동 평균 가중치 (0~1)")
+    parser.add_argument('--tiled', action='store_true',
+                        help="초대형 이미지를 타일 단위로 처리 (Enhanced 결과만 저장)")
+    parser.add_argument('--tile-size', type=int, default=1024, help="타일 크기")
+    parser.add_argument('--tile-workers', type=int, default=1, help="타일 병렬 처리 스레드 수")
+    parser.add_argument('--input', default="2148664187_be75e2c40b_z.jpg", help="입력 이미지 경로")
+    parser.add_argument('--output', default="output.jpg", help="출력 이미지 경로")
+    parser.add_argument('--methods', nargs='+', metavar='NAME',
+                        help=f"계산할 방법만 지정 ({', '.join(EdgeDetector.method_labels())})")
+    return parser.parse_args()
 
 def main():
     """메인 함수"""
+    args = parse_args()
+    
+    if args.batch and args.pipeline:
+        pipeline_process(args.batch, args.output_dir, readers=args.readers, writers=args.writers,
+                         queue_size=args.queue_size, reduced=args.reduced,
+                         jpeg_quality=args.jpeg_quality, png_compression=args.png_compression,
+                         skip_existing=not args.no_skip, median_method=args.median_method)
+        return
+    
+    if args.batch:
+        batch_process(args.batch, args.output_dir, workers=args.workers,
+                      skip_existing=not args.no_skip, median_method=args.median_method)
+        return
+    
     # 파일 경로 설정
-    input_image = "2148664187_be75e2c40b_z.jpg"
-    output_image = "output.jpg"
+    input_image = args.input
+    output_image = args.output
     
     try:
+        if args.video is not None:
+            source = int(args.video) if args.video.isdigit() else args.video
+            detector = EdgeDetector(None, None, median_method=args.median_method)
+            for _ in detector.stream_edge_detection(source, args.video_method, args.video_output,
+                                                    threshold_interval=args.threshold_interval,
+                                                    threshold_smoothing=args.threshold_smoothing):
+                pass
+            return
+        
+        if args.tiled:
+            detector = EdgeDetector(input_image, output_image)
+            detector.tiled_edge_detection(tile_size=args.tile_size, workers=args.tile_workers)
+            return
+        
         # 에지 검출기 생성 및 실행
-        detector = EdgeDetector(input_image, output_image)
-        results = detector.process()
+        if args.no_comparison:
+            comparison = None
+        elif args.headless:
+            comparison = 'mosaic'
+        else:
+            comparison = 'figure'
+        
+        detector = EdgeDetector(input_image, output_image, median_method=args.median_method)
+        results = detector.process(args.methods, comparison, show=not args.headless)
         
         print("\n=== 에지 검출 알고리즘 분석 ===")
         print("1. Canny: 가장 널리 사용되는 에지 검출 알고리즘")
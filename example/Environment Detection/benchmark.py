@@ -0,0 +1,198 @@
+"""
+Eye Blink Detection Benchmark
+녹화된 동영상으로 검출 모드 / 성능 프로필별 FPS, 얼굴 검출 재현율(recall), 깜빡임 검출 정확도를 측정하는 벤치마크
+
+재현율은 매 프레임 전체 검색하는 기본 모드('full')의 얼굴을 기준으로,
+같은 얼굴(IoU >= 0.5)을 찾은 프레임의 비율입니다.
+
+깜빡임 라벨 파일(--labels)은 한 줄에 한 번의 깜빡임을 "눈이 감긴 첫 프레임 마지막 프레임"으로 적습니다.
+라벨이 없으면 'full' 모드의 결과를 기준으로 비교합니다.
+"""
+
+import time
+import argparse
+
+import cv2
+
+from main import EyeBlinkDetector
+
+# 검출 모드별 EyeBlinkDetector 설정
+MODES = {
+    'full': {},
+    'track': {'track': True},
+    'balanced': {'profile': 'balanced'},
+    'fast': {'profile': 'fast'},
+    'fast+track': {'profile': 'fast', 'track': True},
+}
+
+def face_iou(a, b):
+    """(x, y, w, h) 두 박스의 IoU"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    inter_h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = inter_w * inter_h
+    return inter / float(aw * ah + bw * bh - inter)
+
+def run_mode(video_path, settings, max_frames=None, calibrate_frames=0):
+    """
+    한 검출 모드로 동영상을 처리합니다. (디코딩 시간은 제외하고 검출 시간만 측정)
+    calibrate_frames > 0이고 눈 검색 영역을 쓰는 프로필이면 처음 프레임들로 영역을 보정한 뒤 측정합니다.
+
+    Returns:
+        result: {'faces': 프레임별 가장 큰 얼굴 또는 None, 'eyes_open': 프레임별 눈 상태,
+                 'blinks': 깜빡임 횟수, 'blink_frames': 깜빡임이 기록된 프레임 번호,
+                 'fps': 검출 FPS, 'face_stats': 검색 방식별 횟수, 'eye_regions': 사용한 눈 검색 영역}
+    """
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise IOError(f"동영상을 열 수 없습니다: {video_path}")
+
+    detector = EyeBlinkDetector(**settings)
+    if calibrate_frames > 0 and detector.eye_regions is not None:
+        # 보정은 별도 캡처로 하고 측정에서 제외
+        calibration_capture = cv2.VideoCapture(video_path)
+        detector.calibrate_from_capture(calibration_capture, calibrate_frames)
+        calibration_capture.release()
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    faces_per_frame, eyes_per_frame, blink_frames = [], [], []
+    elapsed = 0.0
+    while max_frames is None or len(faces_per_frame) < max_frames:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frame = cv2.flip(frame, 1)
+
+        start = time.perf_counter()
+        eyes_open, _, faces = detector.detect_eyes_state(frame)
+        # 프레임 시각을 사용해 처리 속도와 무관하게 같은 깜빡임 결과를 얻음
+        blink = detector.update_blink_count(eyes_open, len(faces_per_frame) / fps)
+        elapsed += time.perf_counter() - start
+        if blink:
+            blink_frames.append(len(faces_per_frame))
+
+        largest = max(faces, key=lambda face: face[2] * face[3]) if len(faces) > 0 else None
+        faces_per_frame.append(None if largest is None else tuple(int(v) for v in largest))
+        eyes_per_frame.append(eyes_open)
+    capture.release()
+
+    return {
+        'faces': faces_per_frame,
+        'eyes_open': eyes_per_frame,
+        'blinks': detector.blink_count,
+        'blink_frames': blink_frames,
+        'fps': len(faces_per_frame) / elapsed if elapsed > 0 else 0.0,
+        'face_stats': dict(detector.face_stats),
+        'eye_regions': detector.eye_regions,
+    }
+
+def face_recall(reference, faces, iou_threshold=0.5):
+    """기준 얼굴이 있는 프레임 중 같은 얼굴을 찾은 프레임의 비율"""
+    matched = total = 0
+    for expected, found in zip(reference, faces):
+        if expected is None:
+            continue
+        total += 1
+        if found is not None and face_iou(expected, found) >= iou_threshold:
+            matched += 1
+    return matched / total if total else 0.0
+
+def load_blink_labels(path):
+    """
+    깜빡임 라벨 파일을 읽습니다.
+
+    Returns:
+        labels: [(눈이 감긴 첫 프레임, 마지막 프레임), ...]
+    """
+    labels = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#')[0].strip()
+            if line:
+                start, end = (int(value) for value in line.split()[:2])
+                labels.append((start, end))
+    return labels
+
+def blink_accuracy(blink_frames, labels, tolerance=5):
+    """
+    검출된 깜빡임과 라벨을 짝지어 정밀도 / 재현율 / F1을 계산합니다.
+
+    깜빡임은 눈을 다시 뜬 프레임에 기록되므로, 라벨 구간 [시작, 끝 + tolerance] 안에서
+    기록된 깜빡임을 정답으로 봅니다.
+    """
+    unmatched = list(blink_frames)
+    matched = 0
+    for start, end in labels:
+        for frame in unmatched:
+            if start <= frame <= end + tolerance:
+                unmatched.remove(frame)
+                matched += 1
+                break
+    precision = matched / len(blink_frames) if blink_frames else 0.0
+    recall = matched / len(labels) if labels else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1}
+
+def eye_state_agreement(reference, eyes_open):
+    """기준 결과와 프레임별 눈 상태가 같은 비율"""
+    if not reference:
+        return 0.0
+    return sum(a == b for a, b in zip(reference, eyes_open)) / len(reference)
+
+def benchmark_modes(video_path, modes=None, max_frames=None, labels=None, calibrate_frames=0):
+    """
+    검출 모드별 FPS, 얼굴 재현율, 깜빡임 검출 정확도를 비교합니다.
+
+    Args:
+        video_path: 녹화된 동영상 경로
+        modes: {모드 이름: EyeBlinkDetector 설정} (None이면 MODES 전체)
+        max_frames: 처리할 최대 프레임 수
+        labels: load_blink_labels()의 깜빡임 라벨 (None이면 'full' 모드 결과를 기준으로 사용)
+        calibrate_frames: 눈 검색 영역을 쓰는 프로필을 처음 N 프레임으로 보정 (0이면 기본 영역)
+
+    Returns:
+        results: {모드 이름: {'fps', 'recall', 'blinks', 'blink_f1', 'eye_agreement', 'face_stats'}}
+    """
+    modes = modes or MODES
+    reference = run_mode(video_path, MODES['full'], max_frames)
+    if labels is None:
+        labels = [(frame, frame) for frame in reference['blink_frames']]
+
+    print(f"\n=== 검출 모드 비교 ({video_path}, {len(reference['faces'])}프레임, 깜빡임 기준 {len(labels)}회) ===")
+    print(f"{'모드':<12} {'FPS':>8} {'얼굴재현율':>10} {'깜빡임':>6} {'깜빡임F1':>8} {'눈상태일치':>10}  검색 횟수")
+    results = {}
+    for name, settings in modes.items():
+        result = reference if name == 'full' else run_mode(video_path, settings, max_frames, calibrate_frames)
+        results[name] = {
+            'fps': result['fps'],
+            'recall': face_recall(reference['faces'], result['faces']),
+            'blinks': result['blinks'],
+            'blink_f1': blink_accuracy(result['blink_frames'], labels)['f1'],
+            'eye_agreement': eye_state_agreement(reference['eyes_open'], result['eyes_open']),
+            'face_stats': result['face_stats'],
+        }
+        row = results[name]
+        print(f"{name:<12} {row['fps']:8.1f} {row['recall']:10.3f} {row['blinks']:6d} {row['blink_f1']:8.3f} "
+              f"{row['eye_agreement']:10.3f}  {row['face_stats']}")
+
+    return results
+
+def main():
+    """
+    메인 함수
+    """
+    parser = argparse.ArgumentParser(description="눈 깜빡임 검출 벤치마크")
+    parser.add_argument('video', help="녹화된 동영상 파일 경로")
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES), help="비교할 검출 모드")
+    parser.add_argument('--max-frames', type=int, default=None, help="처리할 최대 프레임 수")
+    parser.add_argument('--labels', default=None, help="깜빡임 라벨 파일 (한 줄에 '시작 프레임 끝 프레임')")
+    parser.add_argument('--calibrate', type=int, default=0, metavar='N',
+                        help="눈 검색 영역을 쓰는 프로필을 처음 N 프레임으로 보정")
+    args = parser.parse_args()
+
+    labels = load_blink_labels(args.labels) if args.labels else None
+    benchmark_modes(args.video, {name: MODES[name] for name in args.modes}, args.max_frames, labels,
+                    args.calibrate)
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,48 @@ USB 카메라를 사용한 실시간 눈 깜빡임 검출 AI 예제
 - 눈이 감겼을 때: 빨간색으로 표시
 - 눈이 떴을 때: 초록색으로 표시
 - OpenCV Haar Cascade 사용 (dlib 없이도 동작)
+- 추적 모드: 얼굴을 찾은 뒤에는 이전 얼굴 주변 영역만 검색 (--track)
+- 성능 프로필: 축소 프레임 얼굴 검색 / 얼굴 크기 제한 / 눈 검색 영역 제한 (--profile)
+- 눈 검색 영역 보정: 처음 N 프레임에서 찾은 눈 위치로 눈 검색 영역을 학습 (--calibrate)
+- 오프라인 모드: 녹화된 동영상을 프레임 시각 기준으로 재현 가능하게 처리하고 CSV 로그 저장 (--video, --headless, --log)
 """
 
 import cv2
 import numpy as np
+import os
+import csv
 import time
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 지연 시간 지표를 계산할 최근 프레임 수
+LATENCY_WINDOW = 300
+
+# 얼굴 대비 눈 검색 영역 (x1, y1, x2, y2 비율) - 정면 얼굴 기준 왼쪽 눈 / 오른쪽 눈
+DEFAULT_EYE_REGIONS = ((0.10, 0.15, 0.55, 0.55), (0.45, 0.15, 0.90, 0.55))
+
+# 성능 프로필
+# face_scale: 얼굴 검색 프레임 축소 비율, face/eye_scale_factor: cascade 스케일 간격,
+# bound_face_size: 이전 얼굴 크기로 minSize/maxSize 제한, eye_regions: 눈 검색 영역 (None이면 얼굴 상단 전체)
+PROFILES = {
+    'accurate': {'face_scale': 1.0, 'face_scale_factor': 1.3, 'eye_scale_factor': 1.1,
+                 'bound_face_size': False, 'eye_regions': None},
+    'balanced': {'face_scale': 0.5, 'face_scale_factor': 1.2, 'eye_scale_factor': 1.1,
+                 'bound_face_size': True, 'eye_regions': DEFAULT_EYE_REGIONS},
+    'fast': {'face_scale': 0.33, 'face_scale_factor': 1.3, 'eye_scale_factor': 1.2,
+             'bound_face_size': True, 'eye_regions': DEFAULT_EYE_REGIONS},
+}
 
 class EyeBlinkDetector:
-    def __init__(self):
+    def __init__(self, track=False, redetect_interval=10, roi_margin=0.5, profile='accurate'):
+        """
+        track: True이면 얼굴을 찾은 뒤 이전 얼굴 주변 영역(ROI)만 검색
+        redetect_interval: 추적 모드에서 전체 프레임을 다시 검색하는 주기 (프레임)
+        roi_margin: 이전 얼굴 크기 대비 ROI를 넓히는 비율
+        profile: 성능 프로필 이름 ('accurate', 'balanced', 'fast') 또는 PROFILES와 같은 형식의 딕셔너리
+        """
         # Haar Cascade 분류기 로드
         self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
         self.eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
@@ -19,12 +53,30 @@ class EyeBlinkDetector:
         self.previous_eye_count = 0
         self.closed_frame_count = 0
         self.blink_count = 0
-        self.last_blink_time = 0
+        self.last_blink_time = float('-inf')
         
         # 임계값 설정
         self.min_eye_area = 200  # 최소 눈 영역 크기
         self.blink_threshold = 5  # 깜빡임으로 인정할 최소 프레임 수
         
+        # 얼굴 추적 설정 및 상태
+        self.track = track
+        self.redetect_interval = redetect_interval
+        self.roi_margin = roi_margin
+        self.last_face = None  # 마지막으로 찾은 얼굴 (x, y, w, h)
+        self.frames_since_detect = 0
+        self.face_stats = {'full': 0, 'roi': 0, 'lost': 0}
+        
+        # 성능 프로필 적용
+        settings = dict(PROFILES['accurate'])
+        settings.update(PROFILES[profile] if isinstance(profile, str) else profile)
+        self.profile = profile if isinstance(profile, str) else 'custom'
+        self.face_scale = settings['face_scale']
+        self.face_scale_factor = settings['face_scale_factor']
+        self.eye_scale_factor = settings['eye_scale_factor']
+        self.bound_face_size = settings['bound_face_size']
+        self.eye_regions = settings['eye_regions']
+        
     def detect_eye_area_ratio(self, eye_region):
         """
         눈 영역에서 열린 정도를 계산하는 함수
@@ -43,14 +95,139 @@ class EyeBlinkDetector:
         
         return white_ratio
     
+    def _search_roi(self, frame_shape):
+        """
+        이전 얼굴을 roi_margin 만큼 넓힌 검색 영역 (x1, y1, x2, y2)
+        """
+        x, y, w, h = self.last_face
+        margin_x, margin_y = int(w * self.roi_margin), int(h * self.roi_margin)
+        x1, y1 = max(x - margin_x, 0), max(y - margin_y, 0)
+        x2, y2 = min(x + w + margin_x, frame_shape[1]), min(y + h + margin_y, frame_shape[0])
+        return x1, y1, x2, y2
+    
+    def _cascade_faces(self, gray, offset=(0, 0), bounded=True):
+        """
+        face_scale 만큼 축소한 영상에서 얼굴을 찾고 원래 해상도의 좌표로 변환하는 함수
+        bound_face_size가 켜져 있으면 이전 얼굴 크기의 0.7~1.4배만 검색
+        """
+        scale = self.face_scale
+        small = gray if scale == 1.0 else cv2.resize(gray, None, fx=scale, fy=scale,
+                                                     interpolation=cv2.INTER_AREA)
+        
+        size_limits = {}
+        if bounded and self.bound_face_size and self.last_face is not None:
+            size = self.last_face[2] * scale
+            size_limits['minSize'] = (int(size * 0.7),) * 2
+            size_limits['maxSize'] = (int(size * 1.4) + 1,) * 2
+        
+        faces = self.face_cascade.detectMultiScale(small, self.face_scale_factor, 5, **size_limits)
+        if len(faces) == 0:
+            return ()
+        faces = np.round(np.asarray(faces) / scale).astype(int)
+        return faces + np.array([offset[0], offset[1], 0, 0])
+    
+    def detect_eyes(self, roi_gray, w, h):
+        """
+        얼굴 영역에서 눈을 검출하는 함수
+        eye_regions가 있으면 왼쪽 / 오른쪽 눈 영역에서 눈 크기 범위로만 검색하고 영역마다 한 개씩 사용
+        """
+        if self.eye_regions is None:
+            # 얼굴 상단 2/3 영역 전체 검색
+            return self.eye_cascade.detectMultiScale(roi_gray[:int(h*0.6), :], self.eye_scale_factor, 4)
+        
+        min_eye, max_eye = max(int(w * 0.12), 1), int(w * 0.4) + 1
+        eyes = []
+        for (fx1, fy1, fx2, fy2) in self.eye_regions:
+            x1, y1, x2, y2 = int(w * fx1), int(h * fy1), int(w * fx2), int(h * fy2)
+            found = self.eye_cascade.detectMultiScale(roi_gray[y1:y2, x1:x2], self.eye_scale_factor, 4,
+                                                      minSize=(min_eye, min_eye), maxSize=(max_eye, max_eye))
+            if len(found) > 0:
+                ex, ey, ew, eh = max(found, key=lambda eye: eye[2] * eye[3])
+                eye = (ex + x1, ey + y1, ew, eh)
+                # 두 영역이 겹치는 부분에서 같은 눈이 두 번 잡히면 한 번만 사용
+                if not any(abs(eye[0] - other[0]) < ew / 2 and abs(eye[1] - other[1]) < eh / 2 for other in eyes):
+                    eyes.append(eye)
+        return np.array(eyes, dtype=int).reshape(-1, 4)
+    
+    def calibrate_eye_regions(self, frames, margin=0.05, min_samples=5):
+        """
+        프레임들에서 얼굴 상단 전체를 검색해 찾은 눈 위치로 eye_regions를 보정하는 함수
+        눈 중심이 얼굴 왼쪽 / 오른쪽 절반에 있는 눈들을 각각 감싸는 영역에 margin을 더해 사용
+        """
+        samples = ([], [])
+        for frame in frames:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            for (x, y, w, h) in self.face_cascade.detectMultiScale(gray, 1.3, 5):
+                eyes = self.eye_cascade.detectMultiScale(gray[y:y + int(h*0.6), x:x + w], 1.1, 4)
+                for (ex, ey, ew, eh) in eyes:
+                    box = (ex / w, ey / h, (ex + ew) / w, (ey + eh) / h)
+                    samples[0 if (box[0] + box[2]) / 2 < 0.5 else 1].append(box)
+        
+        if min(len(side) for side in samples) < min_samples:
+            print("눈 검출 표본이 부족해 기존 눈 검색 영역을 유지합니다.")
+            return self.eye_regions
+        
+        regions = []
+        for side in samples:
+            boxes = np.array(side)
+            x1, y1 = np.clip(boxes[:, :2].min(axis=0) - margin, 0.0, 1.0)
+            x2, y2 = np.clip(boxes[:, 2:].max(axis=0) + margin, 0.0, 1.0)
+            regions.append((float(x1), float(y1), float(x2), float(y2)))
+        self.eye_regions = tuple(regions)
+        return self.eye_regions
+    
+    def calibrate_from_capture(self, cap, frame_count):
+        """
+        캡처에서 frame_count 프레임을 읽어 눈 검색 영역을 보정하는 함수 (실시간 모드와 같이 좌우 반전)
+        """
+        frames = []
+        while len(frames) < frame_count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.flip(frame, 1))
+        return self.calibrate_eye_regions(frames)
+    
+    def detect_faces(self, gray):
+        """
+        얼굴을 검출하는 함수
+        추적 모드에서는 이전 얼굴 주변만 검색하고, redetect_interval 프레임마다
+        또는 ROI에서 얼굴을 놓쳤을 때만 전체 프레임을 검색
+        """
+        faces = ()
+        if self.track and self.last_face is not None and self.frames_since_detect < self.redetect_interval:
+            x1, y1, x2, y2 = self._search_roi(gray.shape)
+            faces = self._cascade_faces(gray[y1:y2, x1:x2], (x1, y1))
+            if len(faces) > 0:
+                self.face_stats['roi'] += 1
+                self.frames_since_detect += 1
+            else:
+                self.face_stats['lost'] += 1
+        
+        if len(faces) == 0:
+            # 전체 프레임 검색 (크기 제한으로 못 찾으면 제한 없이 한 번 더)
+            faces = self._cascade_faces(gray)
+            if len(faces) == 0 and self.bound_face_size and self.last_face is not None:
+                faces = self._cascade_faces(gray, bounded=False)
+            self.face_stats['full'] += 1
+            self.frames_since_detect = 0
+        
+        # 가장 큰 얼굴을 다음 프레임의 검색 기준으로 사용
+        if len(faces) > 0:
+            self.last_face = tuple(int(v) for v in max(faces, key=lambda face: face[2] * face[3]))
+        else:
+            self.last_face = None
+        
+        return faces
+    
     def detect_eyes_state(self, frame):
         """
         프레임에서 눈의 상태를 검출하는 함수
         """
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
-        # 얼굴 검출
-        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+        # 얼굴 검출 (추적 모드에서는 이전 얼굴 주변만 검색)
+        faces = self.detect_faces(gray)
         
         eyes_open = True
         detected_eyes = []
@@ -63,8 +240,8 @@ class EyeBlinkDetector:
             roi_gray = gray[y:y + h, x:x + w]
             roi_color = frame[y:y + h, x:x + w]
             
-            # 눈 검출 (얼굴 상단 2/3 영역에서만)
-            eyes = self.eye_cascade.detectMultiScale(roi_gray[:int(h*0.6), :], 1.1, 4)
+            # 눈 검출 (얼굴 상단 2/3 영역 또는 프로필의 눈 검색 영역에서만)
+            eyes = self.detect_eyes(roi_gray, w, h)
             
             current_eye_count = len(eyes)
             detected_eyes = eyes
@@ -93,11 +270,14 @@ class EyeBlinkDetector:
         
         return eyes_open, detected_eyes, faces
     
-    def update_blink_count(self, eyes_open):
+    def update_blink_count(self, eyes_open, timestamp=None):
         """
         깜빡임 횟수를 업데이트하는 함수
+        timestamp: 프레임 시각 (초, None이면 현재 시각) - 녹화 영상은 프레임 번호 / FPS를 넘겨 처리 속도와 무관하게 재현
+        깜빡임이 새로 기록되면 True를 반환
         """
-        current_time = time.time()
+        current_time = time.time() if timestamp is None else timestamp
+        blink_count = self.blink_count
         
         if not eyes_open:
             self.closed_frame_count += 1
@@ -108,6 +288,8 @@ class EyeBlinkDetector:
                     self.blink_count += 1
                     self.last_blink_time = current_time
             self.closed_frame_count = 0
+        
+        return self.blink_count > blink_count
     
     def draw_status(self, frame, eyes_open):
         """
@@ -140,15 +322,429 @@ class EyeBlinkDetector:
         
         return frame
 
+class LatestFrameSlot:
+    """
+    가장 최근 프레임 하나만 보관하는 슬롯
+    소비자가 가져가기 전에 새 프레임이 들어오면 이전 프레임은 버림 (처리가 밀려도 지연이 쌓이지 않음)
+    """
+    
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.item = None
+        self.sequence = 0
+        self.dropped = 0
+        self.closed = False
+    
+    def put(self, item):
+        with self.condition:
+            if self.item is not None:
+                self.dropped += 1
+            self.item = item
+            self.sequence += 1
+            self.condition.notify_all()
+    
+    def get(self, timeout=None):
+        """
+        새 프레임을 꺼내는 함수 (슬롯이 닫히고 비어 있으면 None)
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.item is not None or self.closed, timeout)
+            item, self.item = self.item, None
+            return item
+    
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+def _capture_loop(cap, slot, stop, pace_fps=None):
+    """
+    캡처 스레드 - 카메라에서 읽은 프레임과 캡처 시각을 슬롯에 계속 덮어씀
+    pace_fps가 있으면 동영상 파일을 그 속도로 읽어 실시간 카메라처럼 흉내 냄
+    """
+    next_time = time.perf_counter()
+    while not stop.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            print("프레임을 읽을 수 없습니다.")
+            break
+        if pace_fps:
+            next_time += 1.0 / pace_fps
+            time.sleep(max(next_time - time.perf_counter(), 0))
+        slot.put((frame, time.perf_counter()))
+    slot.close()
+
+def process_frame(detector, frame):
+    """
+    프레임 한 장을 처리하는 함수 - 뒤집기, 눈 상태 검출, 깜빡임 카운트, 상태 표시
+    """
+    # 프레임 뒤집기 (거울 효과)
+    frame = cv2.flip(frame, 1)
+    
+    # 눈 상태 검출 및 깜빡임 카운트 업데이트
+    eyes_open, detected_eyes, faces = detector.detect_eyes_state(frame)
+    detector.update_blink_count(eyes_open)
+    
+    # 상태 표시
+    frame = detector.draw_status(frame, eyes_open)
+    
+    # 얼굴이 검출되지 않은 경우 메시지 표시
+    if len(faces) == 0:
+        cv2.putText(frame, "No Face Detected", (10, 150), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+    
+    return frame, eyes_open
+
+def _process_loop(detector, capture_slot, output_slot, stop):
+    """
+    처리 스레드 - 가장 최근 프레임만 가져와 검출 / 그리기 후 출력 슬롯에 넣음
+    """
+    while not stop.is_set():
+        item = capture_slot.get(timeout=0.1)
+        if item is None:
+            if capture_slot.closed:
+                break
+            continue
+        frame, captured_at = item
+        frame, _ = process_frame(detector, frame)
+        output_slot.put((frame, captured_at))
+    output_slot.close()
+
+def run_pipeline(detector, cap, window_name='Eye Blink Detection - NDvision (OpenCV)'):
+    """
+    캡처 / 처리 / 표시를 나눈 실시간 파이프라인
+    - 캡처 스레드: 항상 가장 최근 프레임만 보관
+    - 처리 스레드: 검출과 그리기
+    - 표시 (메인 스레드): imshow / waitKey, 캡처부터 화면 표시까지의 지연 시간 측정
+    처리가 밀리면 오래된 프레임은 쌓이지 않고 버려짐
+    종료 시 평균 지연 시간은 전체 세션 기준, p95는 최근 LATENCY_WINDOW 프레임 기준
+    """
+    capture_slot = LatestFrameSlot()
+    output_slot = LatestFrameSlot()
+    stop = threading.Event()
+    
+    threads = [
+        threading.Thread(target=_capture_loop, args=(cap, capture_slot, stop), daemon=True),
+        threading.Thread(target=_process_loop, args=(detector, capture_slot, output_slot, stop), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    
+    latencies = deque(maxlen=LATENCY_WINDOW)
+    latency_sum = 0.0
+    displayed = 0
+    fps = 0
+    fps_counter = 0
+    start_time = time.time()
+    
+    try:
+        while True:
+            item = output_slot.get(timeout=0.1)
+            if item is None:
+                if output_slot.closed:
+                    break
+                key = cv2.waitKey(1) & 0xFF
+            else:
+                frame, captured_at = item
+                
+                # FPS 계산 (표시된 프레임 기준)
+                fps_counter += 1
+                if fps_counter >= 30:
+                    fps = fps_counter / (time.time() - start_time)
+                    fps_counter = 0
+                    start_time = time.time()
+                
+                if fps > 0:
+                    cv2.putText(frame, f"FPS: {fps:.1f}", (frame.shape[1] - 150, 30), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                if latencies:
+                    cv2.putText(frame, f"Latency: {latencies[-1]:.0f} ms", (frame.shape[1] - 200, 60), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                
+                # 프레임 표시
+                cv2.imshow(window_name, frame)
+                key = cv2.waitKey(1) & 0xFF
+                
+                # 캡처부터 화면 표시까지의 지연 시간 (카메라 노출 / 전송 지연은 제외)
+                latencies.append((time.perf_counter() - captured_at) * 1000)
+                latency_sum += latencies[-1]
+                displayed += 1
+            
+            # 키 입력 처리
+            if key == ord('q'):
+                break
+            elif key == ord('r'):
+                detector.blink_count = 0
+                print("깜빡임 횟수가 리셋되었습니다.")
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1.0)
+    
+    stats = {
+        'displayed': displayed,
+        'dropped_capture': capture_slot.dropped,
+        'dropped_output': output_slot.dropped,
+        'latency_ms': latency_sum / displayed if displayed else 0.0,
+        'latency_p95_ms': float(np.percentile(list(latencies), 95)) if latencies else 0.0,
+    }
+    print(f"표시된 프레임: {stats['displayed']}, 버린 프레임: 캡처 {stats['dropped_capture']} / 출력 {stats['dropped_output']}")
+    print(f"캡처-표시 지연 시간: 평균 {stats['latency_ms']:.1f} ms, p95 {stats['latency_p95_ms']:.1f} ms")
+    return stats
+
+class StreamState:
+    """
+    스트림 하나의 상태 - 캡처 장치, 전용 검출기 (깜빡임 상태), 최근 프레임 슬롯, 지표
+    """
+    
+    def __init__(self, name, source, detector_options, calibrate_frames=0):
+        self.name = name
+        self.cap = cv2.VideoCapture(source)
+        if not self.cap.isOpened():
+            raise IOError(f"스트림을 열 수 없습니다: {source}")
+        
+        # 동영상 파일은 원래 속도로 읽어 카메라 / RTSP 스트림처럼 동작
+        is_file = isinstance(source, str) and os.path.isfile(source)
+        self.pace_fps = (self.cap.get(cv2.CAP_PROP_FPS) or 30.0) if is_file else None
+        
+        self.detector = EyeBlinkDetector(**detector_options)
+        if calibrate_frames > 0:
+            # 스트림마다 카메라 위치가 다르므로 각자의 처음 프레임으로 보정
+            self.detector.calibrate_from_capture(self.cap, calibrate_frames)
+        self.slot = LatestFrameSlot()
+        self.pending = None
+        self.latest = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.processed = 0
+        self.started = time.perf_counter()
+    
+    def metrics(self):
+        elapsed = time.perf_counter() - self.started
+        latencies = list(self.latencies)
+        return {
+            'fps': self.processed / elapsed if elapsed > 0 else 0.0,
+            'latency_ms': float(np.mean(latencies)) if latencies else 0.0,
+            'latency_p95_ms': float(np.percentile(latencies, 95)) if latencies else 0.0,
+            'processed': self.processed,
+            'dropped': self.slot.dropped,
+            'blinks': self.detector.blink_count,
+        }
+
+def _process_stream_frame(stream, frame, captured_at):
+    """
+    작업자 스레드 작업 - 스트림 전용 검출기로 프레임을 처리 (스트림마다 동시에 한 작업만 실행됨)
+    """
+    annotated, eyes_open = process_frame(stream.detector, frame)
+    return annotated, captured_at
+
+def run_multi_stream(sources, workers=None, show=True, detector_options=None, report_interval=5.0,
+                     calibrate_frames=0):
+    """
+    여러 카메라 / 동영상 / RTSP 스트림을 공유 작업자 풀로 동시에 감시하는 함수
+    - 스트림마다 캡처 스레드와 전용 검출기(깜빡임 상태)를 가짐
+    - 스트림마다 처리 중인 작업은 최대 한 개, 라운드 로빈으로 돌아가며 작업을 배정 (공정 스케줄링)
+    - OpenCV cascade는 실행 중 GIL을 놓으므로 스레드 풀로 여러 코어를 사용
+    - calibrate_frames > 0이면 스트림마다 처음 프레임들로 눈 검색 영역을 보정
+    """
+    detector_options = detector_options or {}
+    streams = []
+    for index, source in enumerate(sources):
+        try:
+            streams.append(StreamState(f"stream{index}:{source}", source, detector_options, calibrate_frames))
+        except IOError as e:
+            print(f"오류: {e}")
+    if not streams:
+        return {}
+    
+    workers = workers or min(len(streams), os.cpu_count() or 1)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    stop = threading.Event()
+    threads = [threading.Thread(target=_capture_loop, args=(stream.cap, stream.slot, stop, stream.pace_fps),
+                                daemon=True) for stream in streams]
+    for thread in threads:
+        thread.start()
+    
+    print(f"{len(streams)}개 스트림, 작업자 {workers}개로 감시를 시작합니다. ('q' 키로 종료)")
+    next_stream = 0
+    last_report = time.perf_counter()
+    try:
+        while True:
+            # 끝난 작업 결과 수집
+            for stream in streams:
+                if stream.pending is not None and stream.pending.done():
+                    stream.latest, captured_at = stream.pending.result()
+                    stream.pending = None
+                    stream.processed += 1
+                    stream.latencies.append((time.perf_counter() - captured_at) * 1000)
+            
+            # 라운드 로빈: 지난번 다음 스트림부터 돌며, 작업이 없고 새 프레임이 있는 스트림에 작업 배정
+            in_flight = sum(stream.pending is not None for stream in streams)
+            for offset in range(len(streams)):
+                if in_flight >= workers:
+                    break
+                stream = streams[(next_stream + offset) % len(streams)]
+                if stream.pending is not None:
+                    continue
+                item = stream.slot.get(timeout=0)
+                if item is None:
+                    continue
+                stream.pending = executor.submit(_process_stream_frame, stream, *item)
+                in_flight += 1
+                next_stream = (next_stream + offset + 1) % len(streams)
+            
+            # 모든 스트림이 끝났으면 종료
+            if all(stream.slot.closed and stream.slot.item is None and stream.pending is None
+                   for stream in streams):
+                break
+            
+            if show:
+                for stream in streams:
+                    if stream.latest is not None:
+                        cv2.imshow(stream.name, stream.latest)
+                        stream.latest = None
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+            else:
+                time.sleep(0.001)
+            
+            # 주기적으로 스트림별 지표 출력
+            if time.perf_counter() - last_report >= report_interval:
+                last_report = time.perf_counter()
+                for stream in streams:
+                    m = stream.metrics()
+                    print(f"[{stream.name}] FPS {m['fps']:.1f}, 지연 {m['latency_ms']:.0f} ms "
+                          f"(p95 {m['latency_p95_ms']:.0f} ms), 버린 프레임 {m['dropped']}, 깜빡임 {m['blinks']}")
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1.0)
+        executor.shutdown(wait=True)
+        for stream in streams:
+            stream.cap.release()
+        if show:
+            cv2.destroyAllWindows()
+    
+    metrics = {stream.name: stream.metrics() for stream in streams}
+    print("=== 스트림별 결과 ===")
+    for name, m in metrics.items():
+        print(f"[{name}] 처리 {m['processed']}프레임, FPS {m['fps']:.1f}, 지연 {m['latency_ms']:.0f} ms "
+              f"(p95 {m['latency_p95_ms']:.0f} ms), 버린 프레임 {m['dropped']}, 깜빡임 {m['blinks']}")
+    return metrics
+
+def process_video(detector, video_path, log_path=None, show=False):
+    """
+    녹화된 동영상을 모든 프레임 빠짐없이 CPU가 허용하는 최대 속도로 처리하는 함수
+    깜빡임 판정에는 벽시계 시각 대신 프레임 시각(프레임 번호 / FPS)을 사용하므로 같은 영상은 항상 같은 결과
+    log_path가 있으면 프레임마다 한 줄의 CSV 로그 저장:
+        frame, time_s, eyes_open, faces, blink, blink_count  (blink=1인 줄이 깜빡임 이벤트)
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"오류: 동영상을 열 수 없습니다: {video_path}")
+        return None
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    
+    log_file = open(log_path, 'w', newline='', encoding='utf-8') if log_path else None
+    writer = csv.writer(log_file) if log_file else None
+    if writer:
+        writer.writerow(['frame', 'time_s', 'eyes_open', 'faces', 'blink', 'blink_count'])
+    
+    events = []
+    frame_index = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            timestamp = frame_index / fps
+            
+            # 실시간 모드와 같은 입력이 되도록 뒤집기 (거울 효과)
+            frame = cv2.flip(frame, 1)
+            eyes_open, detected_eyes, faces = detector.detect_eyes_state(frame)
+            blink = detector.update_blink_count(eyes_open, timestamp)
+            if blink:
+                events.append((frame_index, timestamp))
+            
+            if writer:
+                writer.writerow([frame_index, f"{timestamp:.3f}", int(eyes_open), len(faces), int(blink),
+                                 detector.blink_count])
+            
+            if show:
+                cv2.imshow('Eye Blink Detection - NDvision (OpenCV)', detector.draw_status(frame, eyes_open))
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+            frame_index += 1
+    finally:
+        cap.release()
+        if log_file:
+            log_file.close()
+        if show:
+            cv2.destroyAllWindows()
+    
+    elapsed = time.perf_counter() - start
+    summary = {
+        'frames': frame_index,
+        'duration_s': frame_index / fps,
+        'blinks': detector.blink_count,
+        'events': events,
+        'processing_fps': frame_index / elapsed if elapsed > 0 else 0.0,
+    }
+    print(f"처리한 프레임: {summary['frames']} ({summary['duration_s']:.1f}초 분량), "
+          f"처리 속도: {summary['processing_fps']:.1f} FPS")
+    print(f"깜빡임 {summary['blinks']}회: " + ", ".join(f"{t:.2f}s" for _, t in events))
+    if log_path:
+        print(f"프레임별 로그가 저장되었습니다: {log_path}")
+    return summary
+
+def parse_args():
+    """
+    명령행 인자를 파싱합니다.
+    """
+    parser = argparse.ArgumentParser(description="눈 깜빡임 검출")
+    parser.add_argument('--track', action='store_true', help="얼굴을 찾은 뒤 이전 얼굴 주변만 검색")
+    parser.add_argument('--redetect-interval', type=int, default=10, help="추적 모드의 전체 프레임 재검색 주기")
+    parser.add_argument('--profile', default='accurate', choices=list(PROFILES), help="성능 프로필")
+    parser.add_argument('--streams', nargs='+', default=None,
+                        help="동시에 감시할 스트림 (카메라 번호, 동영상 파일 또는 RTSP URL)")
+    parser.add_argument('--workers', type=int, default=None, help="다중 스트림 작업자 스레드 수")
+    parser.add_argument('--video', default=None, help="녹화된 동영상 파일을 오프라인으로 처리")
+    parser.add_argument('--headless', action='store_true', help="화면 없이 처리 (--video, --streams)")
+    parser.add_argument('--log', default=None, help="프레임별 눈 상태 / 깜빡임 CSV 로그 경로 (--video)")
+    parser.add_argument('--calibrate', type=int, default=0, metavar='N',
+                        help="처음 N 프레임에서 찾은 눈 위치로 눈 검색 영역을 보정 (0이면 프로필 기본 영역)")
+    return parser.parse_args()
+
 def main():
     """
     메인 함수 - USB 카메라로 실시간 눈 깜빡임 검출
     """
+    args = parse_args()
     print("USB 카메라 눈 깜빡임 검출 프로그램을 시작합니다...")
     print("OpenCV Haar Cascade 기반 검출 사용")
     
+    detector_options = {'track': args.track, 'redetect_interval': args.redetect_interval, 'profile': args.profile}
+    
+    # 다중 스트림 감시
+    if args.streams:
+        sources = [int(source) if source.isdigit() else source for source in args.streams]
+        run_multi_stream(sources, args.workers, not args.headless, detector_options,
+                         calibrate_frames=args.calibrate)
+        return
+    
+    # 녹화된 동영상 오프라인 처리
+    if args.video:
+        detector = EyeBlinkDetector(**detector_options)
+        if args.calibrate > 0:
+            # 별도 캡처로 보정하여 본 처리는 첫 프레임부터 모두 처리
+            calibration_cap = cv2.VideoCapture(args.video)
+            print(f"눈 검색 영역 보정: {detector.calibrate_from_capture(calibration_cap, args.calibrate)}")
+            calibration_cap.release()
+        process_video(detector, args.video, args.log, show=not args.headless)
+        return
+    
     # 눈 깜빡임 검출기 초기화
-    detector = EyeBlinkDetector()
+    detector = EyeBlinkDetector(**detector_options)
     
     # 카메라 초기화
     cap = cv2.VideoCapture(0)
@@ -162,64 +758,21 @@ def main():
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
     cap.set(cv2.CAP_PROP_FPS, 30)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # 드라이버 버퍼에 오래된 프레임이 쌓이지 않도록
     
     print("카메라가 성공적으로 연결되었습니다!")
+    
+    if args.calibrate > 0:
+        print(f"정면을 바라봐 주세요. {args.calibrate} 프레임으로 눈 검색 영역을 보정합니다...")
+        print(f"눈 검색 영역 보정: {detector.calibrate_from_capture(cap, args.calibrate)}")
     print("사용법:")
     print("- 초록색: 눈이 뜬 상태")
     print("- 빨간색: 눈이 감긴 상태")
     print("- 'q' 키를 눌러 종료")
     print("- 'r' 키를 눌러 깜빡임 횟수 리셋")
     
-    fps_counter = 0
-    start_time = time.time()
-    
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("프레임을 읽을 수 없습니다.")
-            break
-        
-        # 프레임 뒤집기 (거울 효과)
-        frame = cv2.flip(frame, 1)
-        
-        # 눈 상태 검출
-        eyes_open, detected_eyes, faces = detector.detect_eyes_state(frame)
-        
-        # 깜빡임 카운트 업데이트
-        detector.update_blink_count(eyes_open)
-        
-        # 상태 표시
-        frame = detector.draw_status(frame, eyes_open)
-        
-        # 얼굴이 검출되지 않은 경우 메시지 표시
-        if len(faces) == 0:
-            cv2.putText(frame, "No Face Detected", (10, 150), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-        
-        # FPS 계산 및 표시
-        fps_counter += 1
-        if fps_counter >= 30:
-            elapsed_time = time.time() - start_time
-            fps = fps_counter / elapsed_time
-            fps_counter = 0
-            start_time = time.time()
-        else:
-            fps = 0
-        
-        if fps > 0:
-            cv2.putText(frame, f"FPS: {fps:.1f}", (frame.shape[1] - 150, 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        
-        # 프레임 표시
-        cv2.imshow('Eye Blink Detection - NDvision (OpenCV)', frame)
-        
-        # 키 입력 처리
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('r'):
-            detector.blink_count = 0
-            print("깜빡임 횟수가 리셋되었습니다.")
+    # 캡처 / 처리 / 표시 파이프라인 실행
+    run_pipeline(detector, cap)
     
     # 정리
     cap.release()
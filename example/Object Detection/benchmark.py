@@ -0,0 +1,226 @@
+"""
+Object Detection Benchmark
+객체 탐지 파이프라인의 처리량을 측정하는 벤치마크
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from main import (BACKENDS, load_model, collect_image_paths, detect_image_batches, detections_from_results,
+                  draw_detections, inference_options, postprocess_ms)
+
+# 기본 입력 이미지 (main.py와 동일)
+DEFAULT_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "2477308902_443e5baf08_z.jpg")
+
+def benchmark_batch_sizes(model, inputs, batch_sizes=(1, 2, 4, 8, 16), num_threads=4, min_images=32):
+    """
+    배치 크기별 처리량(images/sec)을 측정합니다.
+
+    Args:
+        model: 로드된 YOLO 모델
+        inputs: 이미지 경로 리스트, 디렉토리 또는 glob 패턴
+        batch_sizes: 측정할 배치 크기 목록
+        num_threads: 이미지 디코딩 스레드 수
+        min_images: 측정에 사용할 최소 이미지 수 (부족하면 입력을 반복)
+
+    Returns:
+        results: {배치 크기: images/sec}
+    """
+    paths = collect_image_paths(inputs)
+    if not paths:
+        print("벤치마크할 이미지가 없습니다.")
+        return {}
+    paths = (paths * (min_images // len(paths) + 1))[:max(min_images, len(paths))]
+
+    # 예열 (첫 추론의 초기화 비용 제외)
+    for _ in detect_image_batches(model, paths[:1], batch_size=1, draw=False):
+        pass
+
+    print(f"\n=== 배치 크기별 처리량 ({len(paths)}개 이미지) ===")
+    results = {}
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        count = 0
+        for _ in detect_image_batches(model, paths, batch_size, num_threads, draw=False):
+            count += 1
+        elapsed = time.perf_counter() - start
+        results[batch_size] = count / elapsed if elapsed > 0 else 0.0
+        print(f"배치 크기 {batch_size:>3}: {results[batch_size]:8.2f} images/sec")
+
+    return results
+
+# 백엔드별로 import 해야 하는 모듈 (import 시간 측정용)
+BACKEND_IMPORTS = {
+    'ultralytics': 'import cv2, ultralytics',
+    'opencv': 'import cv2',
+    'onnxruntime': 'import cv2, onnxruntime',
+}
+
+def measure_import_time(backend):
+    """
+    새 파이썬 프로세스에서 백엔드 모듈의 import 시간(초)을 측정합니다.
+    """
+    code = ("import time; start = time.perf_counter(); " + BACKEND_IMPORTS[backend] +
+            "; print(time.perf_counter() - start)")
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+def _peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB, Windows에서는 None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _run_backend_case(backend, weights, image_path, repeats):
+    """
+    새 프로세스 안에서 한 백엔드의 로드 시간, 추론 지연 시간, 최대 RSS를 측정합니다.
+    """
+    start = time.perf_counter()
+    model = load_model(weights, warmup=1, offline=True, backend=backend)
+    load_time = time.perf_counter() - start
+    if model is None:
+        return None
+
+    image = cv2.imread(image_path)
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model(image, verbose=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    return {
+        'load_s': load_time,
+        'latency_ms': latencies[len(latencies) // 2],
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+def benchmark_backends(backends=BACKENDS, weights='yolov8n.pt', image_path=DEFAULT_IMAGE, repeats=20):
+    """
+    백엔드별 import 시간, 로드 시간, 추론 지연 시간(중앙값), 최대 RSS를 비교합니다.
+
+    각 백엔드는 서로의 메모리 사용량이 섞이지 않도록 새 프로세스(spawn)에서 측정합니다.
+
+    Returns:
+        results: {백엔드: 측정 결과 딕셔너리}
+    """
+    context = multiprocessing.get_context('spawn')
+
+    print(f"\n=== 백엔드 비교 ({weights}, {repeats}회 반복) ===")
+    print(f"{'백엔드':<12} {'import(s)':>10} {'로드(s)':>9} {'지연(ms)':>10} {'RSS(MB)':>9}")
+    results = {}
+    for backend in backends:
+        try:
+            import_time = measure_import_time(backend)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                case = executor.submit(_run_backend_case, backend, weights, image_path, repeats).result()
+        except Exception as e:
+            print(f"{backend:<12} 측정 실패: {e}")
+            continue
+        if case is None:
+            print(f"{backend:<12} 모델을 로드하지 못했습니다.")
+            continue
+
+        case['import_s'] = import_time
+        results[backend] = case
+        rss = f"{case['peak_rss_mb']:9.1f}" if case['peak_rss_mb'] is not None else f"{'-':>9}"
+        print(f"{backend:<12} {import_time:10.2f} {case['load_s']:9.2f} {case['latency_ms']:10.1f} {rss}")
+
+    return results
+
+def benchmark_filtering(model, image_path=DEFAULT_IMAGE, options=None, repeats=20):
+    """
+    그리기 단계에서 거르는 방식과 추론 단계 (NMS 전)에서 거르는 방식의 후처리 시간을 비교합니다.
+
+    기존 방식: 모델 기본 신뢰도(0.25)로 모든 박스를 받은 뒤 draw_detections()에서 conf 0.5로 거름
+    새 방식: inference_options()의 conf / classes / max_det을 model 호출에 넘기고 그대로 그림
+
+    박스가 많은 장면(군중, 주차장 등)일수록 차이가 큽니다.
+
+    Returns:
+        results: {'baseline': {...}, 'filtered': {...}} - 후처리 / 그리기 시간(ms)과 박스 수
+    """
+    image = cv2.imread(image_path)
+    if image is None:
+        print(f"이미지를 로드할 수 없습니다: {image_path}")
+        return {}
+    options = options or inference_options(model)
+    cases = {
+        'baseline': ({}, options['conf']),
+        'filtered': (options, None),
+    }
+
+    results = {}
+    for name, (call_options, draw_threshold) in cases.items():
+        model(image, verbose=False, **call_options)  # 예열
+        postprocess, draw, boxes = [], [], 0
+        for _ in range(repeats):
+            output = model(image, verbose=False, **call_options)
+            postprocess.append(postprocess_ms(model, output) or 0.0)
+            start = time.perf_counter()
+            detections = detections_from_results(output)
+            draw_detections(image, detections, draw_threshold, verbose=False)
+            draw.append((time.perf_counter() - start) * 1000)
+            boxes = len(detections['conf'])
+        results[name] = {
+            'postprocess_ms': float(np.median(postprocess)),
+            'draw_ms': float(np.median(draw)),
+            'boxes': boxes,
+        }
+
+    print(f"\n=== 필터링 위치별 후처리 시간 ({os.path.basename(image_path)}, {repeats}회 중앙값) ===")
+    print(f"{'방식':<10} {'후처리(ms)':>10} {'그리기(ms)':>10} {'반환 박스':>9}")
+    for name, row in results.items():
+        print(f"{name:<10} {row['postprocess_ms']:10.2f} {row['draw_ms']:10.2f} {row['boxes']:9d}")
+    saved = sum(results['baseline'][k] - results['filtered'][k] for k in ('postprocess_ms', 'draw_ms'))
+    print(f"이미지당 절약된 시간: {saved:.2f} ms")
+    return results
+
+def main():
+    """
+    메인 함수
+    """
+    parser = argparse.ArgumentParser(description="객체 탐지 벤치마크")
+    parser.add_argument('--inputs', nargs='+', default=[DEFAULT_IMAGE],
+                        help="이미지 경로, 디렉토리 또는 glob 패턴")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help="측정할 배치 크기 목록")
+    parser.add_argument('--threads', type=int, default=4, help="이미지 디코딩 스레드 수")
+    parser.add_argument('--backend', default='ultralytics', choices=BACKENDS, help="탐지 백엔드")
+    parser.add_argument('--compare-backends', nargs='*', choices=BACKENDS, default=None,
+                        help="백엔드별 import 시간 / 지연 시간 / RSS 비교 (목록 생략 시 전체)")
+    parser.add_argument('--weights', default='yolov8n.pt', help="모델 가중치 (.pt, ONNX는 같은 이름의 .onnx)")
+    parser.add_argument('--filtering', action='store_true',
+                        help="그리기 단계 필터링과 추론 단계 필터링의 후처리 시간 비교")
+    parser.add_argument('--conf', type=float, default=0.5, help="--filtering에서 사용할 최소 신뢰도")
+    parser.add_argument('--classes', nargs='+', default=None, help="--filtering에서 사용할 클래스 이름 또는 ID")
+    args = parser.parse_args()
+
+    if args.compare_backends is not None:
+        benchmark_backends(args.compare_backends or BACKENDS, args.weights, args.inputs[0])
+        return
+
+    model = load_model(args.weights, backend=args.backend)
+    if model is None:
+        return
+
+    if args.filtering:
+        benchmark_filtering(model, args.inputs[0], inference_options(model, args.conf, classes=args.classes))
+        return
+
+    benchmark_batch_sizes(model, args.inputs, args.batch_sizes, args.threads)
+
+if __name__ == "__main__":
+    main()
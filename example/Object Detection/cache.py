@@ -0,0 +1,218 @@
+"""
+Detection Cache
+디코딩된 이미지 내용 해시 + 모델 가중치 해시 + 추론 파라미터를 키로 탐지 결과를 디스크에 저장하는 캐시
+
+같은 이미지를 같은 모델 / 파라미터로 다시 처리하면 추론을 건너뛰고 저장된 결과를 반환합니다.
+전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 지웁니다 (LRU, 파일 수정 시각 기준).
+클래스 이름 사전은 항목마다 저장하지 않고 names/ 디렉토리에 내용 해시별로 한 번만 저장합니다.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+@lru_cache(maxsize=64)
+def _file_hash(path, mtime, size):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def weights_hash(model):
+    """
+    모델 가중치 파일의 해시를 반환합니다. (파일 경로 / 수정 시각 / 크기가 같으면 다시 계산하지 않음)
+
+    가중치 파일을 찾을 수 없으면 None을 반환합니다. (모델을 구분할 수 없으므로 캐시하지 않음)
+    """
+    path = getattr(model, 'weights_path', None) or getattr(model, 'ckpt_path', None)
+    if path and os.path.exists(path):
+        stat = os.stat(path)
+        return _file_hash(os.path.abspath(path), stat.st_mtime, stat.st_size)
+    return None
+
+def model_backend(model):
+    """추론 백엔드 이름 (OnnxDetector는 'opencv' / 'onnxruntime', 그 외는 모델 클래스 이름)"""
+    backend = getattr(model, 'backend', None)
+    return backend if isinstance(backend, str) else type(model).__name__
+
+def image_hash(image):
+    """디코딩된 이미지 픽셀 + 형태의 해시 (같은 이미지가 다른 파일 이름 / 형식으로 저장되어도 같음)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((image.shape, image.dtype.str)).encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+class DetectionCache:
+    """
+    크기가 제한된 디스크 탐지 결과 캐시
+
+    사용 예:
+        cache = DetectionCache('.detection_cache', max_bytes=256 * 1024 * 1024)
+        results, image = detect_objects(model, image_path, cache=cache)
+        print(cache.stats())
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            directory: 캐시 디렉토리
+            max_bytes: 캐시 전체의 최대 크기 (바이트)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncacheable = 0
+        self._lock = threading.Lock()
+        self._names = {}
+        os.makedirs(os.path.join(directory, 'names'), exist_ok=True)
+
+        # 시작할 때 한 번만 디렉토리를 훑어 현재 크기를 계산
+        self.total_bytes = sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.npz'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_mtime, stat.st_size
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.npz')
+
+    def _store_names(self, names):
+        """클래스 이름 사전을 한 번만 저장하고 내용 해시를 반환합니다."""
+        text = json.dumps({int(k): v for k, v in names.items()}, sort_keys=True)
+        names_id = hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+        if names_id not in self._names:
+            path = os.path.join(self.directory, 'names', names_id + '.json')
+            if not os.path.exists(path):
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(temp_path, path)
+            self._names[names_id] = {int(k): v for k, v in names.items()}
+        return names_id
+
+    def _load_names(self, names_id):
+        names = self._names.get(names_id)
+        if names is None:
+            with open(os.path.join(self.directory, 'names', names_id + '.json'), 'r', encoding='utf-8') as f:
+                names = {int(k): v for k, v in json.load(f).items()}
+            self._names[names_id] = names
+        return names
+
+    def key(self, model, image, params=None):
+        """
+        캐시 키를 만듭니다. 같은 가중치라도 백엔드마다 디코딩 / NMS가 다르므로 백엔드를 키에 포함합니다.
+
+        Args:
+            model: 탐지 모델 (가중치 해시와 백엔드에 사용)
+            image: 디코딩된 이미지
+            params: 결과에 영향을 주는 추론 파라미터 딕셔너리
+
+        Returns:
+            key: 캐시 키 (가중치 파일을 찾을 수 없는 모델이면 None - get / put이 캐시를 사용하지 않음)
+        """
+        weights = weights_hash(model)
+        if weights is None:
+            with self._lock:
+                if self.uncacheable == 0:
+                    print("가중치 파일을 찾을 수 없는 모델이라 탐지 결과를 캐시하지 않습니다.")
+                self.uncacheable += 1
+            return None
+        params = json.dumps(params or {}, sort_keys=True, default=str)
+        digest = hashlib.blake2b(digest_size=20)
+        for part in (image_hash(image), weights, model_backend(model), params):
+            digest.update(part.encode())
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        저장된 탐지 결과를 반환합니다. (없거나 key가 None이면 None)
+        """
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                detections = {
+                    'xyxy': data['xyxy'],
+                    'conf': data['conf'],
+                    'cls': data['cls'],
+                    'names': self._load_names(str(data['names_id'])),
+                }
+            # 사용 시각 갱신 (LRU)
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return detections
+
+    def put(self, key, detections):
+        """
+        탐지 결과를 저장하고 크기 제한을 넘으면 오래된 항목을 지웁니다. (key가 None이면 저장하지 않음)
+        """
+        if key is None:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f,
+                     xyxy=np.asarray(detections['xyxy'], dtype=np.float32),
+                     conf=np.asarray(detections['conf'], dtype=np.float32),
+                     cls=np.asarray(detections['cls'], dtype=np.int32),
+                     names_id=self._store_names(detections['names']))
+        size = os.path.getsize(temp_path)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self.total_bytes += size - previous
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # 목표 크기를 한도의 90%로 잡아 삽입할 때마다 훑지 않도록 함
+        target = self.max_bytes * 0.9
+        for path, _, size in sorted(self._entries(), key=lambda entry: entry[1]):
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Returns:
+            stats: {'hits', 'misses', 'evictions', 'uncacheable', 'hit_rate', 'bytes', 'max_bytes'}
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'uncacheable': self.uncacheable,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,288 @@
+"""
+Detection Export
+탐지 결과(박스, 신뢰도, 클래스, 이미지 ID)를 열(column) 단위 데이터로 저장하고 읽는 도구
+
+저장 형식:
+    npy     - 샤드마다 열별 .npy 파일 (기본값, 읽을 때 메모리 매핑)
+    parquet - 샤드마다 .parquet 파일 (pyarrow 필요)
+    jsonl   - 이미지마다 한 줄의 JSON (의존성 없는 대체 형식)
+
+디렉토리 구조:
+    meta.json        형식 정보
+    images.jsonl     {"image_id": 0, "path": "..."} (이미지 ID -> 경로)
+    shard-00000/     npy 형식: image_id.npy, xyxy.npy, conf.npy, cls.npy
+    shard-00000.parquet / detections.jsonl
+"""
+
+import os
+import re
+import json
+import glob
+import shutil
+
+import numpy as np
+
+EXPORT_FORMATS = ('npy', 'parquet', 'jsonl')
+
+# 완료된 샤드 이름 (npy: shard-00000 디렉토리, parquet: shard-00000.parquet)
+SHARD_PATTERN = re.compile(r'^shard-(\d+)(\.parquet)?$')
+
+# 열 이름과 자료형
+COLUMNS = {
+    'image_id': np.int64,
+    'xyxy': np.float32,
+    'conf': np.float32,
+    'cls': np.int32,
+}
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _read_meta(directory):
+    meta_path = os.path.join(directory, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class DetectionWriter:
+    """
+    탐지 결과를 버퍼에 모았다가 buffer_rows 개마다 한 번에 샤드로 기록하는 추가 전용(append-only) 저장기
+
+    같은 디렉토리를 다시 열면 기존 샤드 뒤에 이어서 기록합니다.
+
+    사용 예:
+        with DetectionWriter('detections/') as writer:
+            for path, annotated, detections in detect_objects_batch(model, inputs):
+                writer.add(path, detections)
+    """
+
+    def __init__(self, directory, format=None, buffer_rows=65536):
+        """
+        Args:
+            directory: 저장 디렉토리
+            format: 'npy', 'parquet' 또는 'jsonl' (None이면 기존 형식, 새 디렉토리는 'npy')
+            buffer_rows: 샤드 하나에 모을 박스 수
+        """
+        self.directory = directory
+        self.buffer_rows = buffer_rows
+        os.makedirs(directory, exist_ok=True)
+
+        meta = _read_meta(directory)
+        if meta is not None:
+            if format is not None and format != meta['format']:
+                raise ValueError(f"기존 형식({meta['format']})과 다른 형식으로 추가할 수 없습니다: {format}")
+            format = meta['format']
+        format = format or 'npy'
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"알 수 없는 저장 형식: {format} (사용 가능: {EXPORT_FORMATS})")
+        if format == 'parquet' and not _has_pyarrow():
+            print("pyarrow가 설치되어 있지 않아 jsonl 형식으로 저장합니다.")
+            format = 'jsonl'
+        self.format = format
+
+        if meta is None:
+            with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({'format': format, 'columns': list(COLUMNS)}, f)
+
+        # 이어서 기록할 이미지 ID와 샤드 번호
+        self.next_image_id = 0
+        images_path = os.path.join(directory, 'images.jsonl')
+        if os.path.exists(images_path):
+            with open(images_path, 'r', encoding='utf-8') as f:
+                self.next_image_id = sum(1 for _ in f)
+        self.next_shard = self._next_shard_index()
+
+        self._images = []
+        self._reset_buffer()
+
+    def _next_shard_index(self):
+        """중단된 기록이 남긴 .tmp를 지우고, 완료된 샤드의 가장 큰 번호 + 1을 반환합니다."""
+        indices = [-1]
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith('shard-') and name.endswith('.tmp'):
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+                continue
+            match = SHARD_PATTERN.match(name)
+            if match:
+                indices.append(int(match.group(1)))
+        return max(indices) + 1
+
+    def _reset_buffer(self):
+        self._buffer = {name: [] for name in COLUMNS}
+        self._buffered_rows = 0
+
+    def add(self, path, detections):
+        """
+        이미지 한 장의 탐지 결과를 추가합니다.
+
+        Args:
+            path: 이미지 경로 (또는 임의의 식별 문자열)
+            detections: detections_from_results() 형식의 탐지 결과
+
+        Returns:
+            image_id: 부여된 이미지 ID
+        """
+        image_id = self.next_image_id
+        self.next_image_id += 1
+        self._images.append({'image_id': image_id, 'path': path})
+
+        count = len(detections['conf'])
+        self._buffer['image_id'].append(np.full(count, image_id, dtype=np.int64))
+        self._buffer['xyxy'].append(np.asarray(detections['xyxy'], dtype=np.float32).reshape(-1, 4))
+        self._buffer['conf'].append(np.asarray(detections['conf'], dtype=np.float32))
+        self._buffer['cls'].append(np.asarray(detections['cls'], dtype=np.int32))
+        self._buffered_rows += count
+
+        if self._buffered_rows >= self.buffer_rows:
+            self.flush()
+        return image_id
+
+    def flush(self):
+        """버퍼의 내용을 새 샤드로 기록합니다."""
+        if self._images:
+            with open(os.path.join(self.directory, 'images.jsonl'), 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(image, ensure_ascii=False) + '\n' for image in self._images)
+            self._images = []
+
+        if self._buffered_rows == 0:
+            self._reset_buffer()
+            return
+
+        columns = {name: np.concatenate(parts).astype(COLUMNS[name], copy=False)
+                   for name, parts in self._buffer.items()}
+        shard = os.path.join(self.directory, f"shard-{self.next_shard:05d}")
+
+        if self.format == 'npy':
+            # 샤드 디렉토리를 다 쓴 뒤 이름을 바꿔, 중간에 끊겨도 반쪽 샤드가 보이지 않게 함
+            os.makedirs(shard + '.tmp', exist_ok=True)
+            for name, values in columns.items():
+                np.save(os.path.join(shard + '.tmp', name + '.npy'), values)
+            os.replace(shard + '.tmp', shard)
+        elif self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.table({
+                'image_id': columns['image_id'],
+                'x1': columns['xyxy'][:, 0], 'y1': columns['xyxy'][:, 1],
+                'x2': columns['xyxy'][:, 2], 'y2': columns['xyxy'][:, 3],
+                'conf': columns['conf'],
+                'cls': columns['cls'],
+            })
+            pq.write_table(table, shard + '.parquet.tmp')
+            os.replace(shard + '.parquet.tmp', shard + '.parquet')
+        else:
+            with open(os.path.join(self.directory, 'detections.jsonl'), 'a', encoding='utf-8') as f:
+                for row in zip(columns['image_id'].tolist(), columns['xyxy'].tolist(),
+                               columns['conf'].tolist(), columns['cls'].tolist()):
+                    f.write(json.dumps(dict(zip(COLUMNS, row))) + '\n')
+
+        if self.format != 'jsonl':
+            self.next_shard += 1
+        self._reset_buffer()
+
+    def close(self):
+        """남은 버퍼를 기록합니다."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class DetectionReader:
+    """
+    DetectionWriter로 저장한 탐지 결과를 읽습니다.
+
+    npy 형식은 np.load(mmap_mode='r')로 열어, 필터에 필요한 conf / cls 열만 먼저 읽고
+    조건에 맞는 행의 박스만 메모리로 가져옵니다.
+    """
+
+    def __init__(self, directory):
+        meta = _read_meta(directory)
+        if meta is None:
+            raise FileNotFoundError(f"탐지 결과 디렉토리가 아닙니다: {directory}")
+        self.directory = directory
+        self.format = meta['format']
+
+    def image_paths(self):
+        """
+        Returns:
+            paths: {이미지 ID: 경로}
+        """
+        paths = {}
+        images_path = os.path.join(self.directory, 'images.jsonl')
+        if os.path.exists(images_path):
+            with open(images_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    image = json.loads(line)
+                    paths[image['image_id']] = image['path']
+        return paths
+
+    def iter_shards(self, classes=None, min_conf=0.0):
+        """
+        샤드마다 조건에 맞는 탐지 결과를 반환합니다.
+
+        Args:
+            classes: 남길 클래스 ID 목록 (None이면 전체)
+            min_conf: 최소 신뢰도
+
+        Yields:
+            {'image_id', 'xyxy', 'conf', 'cls'} 열 딕셔너리
+        """
+        if self.format == 'npy':
+            for shard in sorted(glob.glob(os.path.join(self.directory, 'shard-*[0-9]'))):
+                columns = {name: np.load(os.path.join(shard, name + '.npy'), mmap_mode='r') for name in COLUMNS}
+                mask = columns['conf'] >= min_conf
+                if classes is not None:
+                    mask &= np.isin(columns['cls'], classes)
+                rows = np.flatnonzero(mask)
+                yield {name: np.asarray(values[rows]) for name, values in columns.items()}
+
+        elif self.format == 'parquet':
+            import pyarrow.parquet as pq
+            filters = [('conf', '>=', float(min_conf))]
+            if classes is not None:
+                filters.append(('cls', 'in', [int(c) for c in classes]))
+            for shard in sorted(glob.glob(os.path.join(self.directory, 'shard-*.parquet'))):
+                table = pq.read_table(shard, filters=filters, memory_map=True)
+                yield {
+                    'image_id': table['image_id'].to_numpy(),
+                    'xyxy': np.stack([table[name].to_numpy() for name in ('x1', 'y1', 'x2', 'y2')], axis=1)
+                            .reshape(-1, 4),
+                    'conf': table['conf'].to_numpy(),
+                    'cls': table['cls'].to_numpy(),
+                }
+
+        else:
+            detections_path = os.path.join(self.directory, 'detections.jsonl')
+            if not os.path.exists(detections_path):
+                return
+            buffer = {name: [] for name in COLUMNS}
+            with open(detections_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    row = json.loads(line)
+                    if row['conf'] < min_conf or (classes is not None and row['cls'] not in classes):
+                        continue
+                    for name in COLUMNS:
+                        buffer[name].append(row[name])
+            yield {name: np.array(values, dtype=COLUMNS[name]).reshape((-1, 4) if name == 'xyxy' else -1)
+                   for name, values in buffer.items()}
+
+    def query(self, classes=None, min_conf=0.0):
+        """
+        조건에 맞는 모든 탐지 결과를 하나의 열 딕셔너리로 합쳐 반환합니다. (iter_shards() 참고)
+        """
+        parts = list(self.iter_shards(classes, min_conf))
+        if not parts:
+            return {name: np.zeros((0, 4) if name == 'xyxy' else 0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
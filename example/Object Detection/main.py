@@ -5,33 +5,387 @@ Object Detection using YOLOv8
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
 import os
-import matplotlib.pyplot as plt
+import ast
+import glob
+import time
+import argparse
+import queue
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
-def load_model():
+# 배치 모드에서 처리할 이미지 확장자
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+
+# 로컬 가중치 디렉토리 (오프라인 환경에서는 여기에 yolov8n.pt 등을 미리 넣어 둠)
+DEFAULT_WEIGHTS_DIR = os.environ.get('NDVISION_WEIGHTS_DIR', os.path.dirname(os.path.abspath(__file__)))
+
+# 탐지 백엔드 (ultralytics: PyTorch, opencv: cv2.dnn + ONNX, onnxruntime: ONNX Runtime)
+BACKENDS = ('ultralytics', 'opencv', 'onnxruntime')
+
+# COCO 클래스 이름 (ONNX 모델에 메타데이터가 없을 때 사용)
+COCO_NAMES = (
+    'person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train', 'truck', 'boat',
+    'traffic light', 'fire hydrant', 'stop sign', 'parking meter', 'bench', 'bird', 'cat', 'dog',
+    'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra', 'giraffe', 'backpack', 'umbrella',
+    'handbag', 'tie', 'suitcase', 'frisbee', 'skis', 'snowboard', 'sports ball', 'kite',
+    'baseball bat', 'baseball glove', 'skateboard', 'surfboard', 'tennis racket', 'bottle',
+    'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple', 'sandwich', 'orange',
+    'broccoli', 'carrot', 'hot dog', 'pizza', 'donut', 'cake', 'chair', 'couch', 'potted plant',
+    'bed', 'dining table', 'toilet', 'tv', 'laptop', 'mouse', 'remote', 'keyboard', 'cell phone',
+    'microwave', 'oven', 'toaster', 'sink', 'refrigerator', 'book', 'clock', 'vase', 'scissors',
+    'teddy bear', 'hair drier', 'toothbrush',
+)
+
+# 프로세스 전체에서 공유하는 모델 캐시 {(가중치 경로, task, 입력 크기, 백엔드): 모델}
+_MODEL_CACHE = {}
+
+# 모델별 로드 시간 / 첫 추론 지연 시간 (초)
+MODEL_LOAD_STATS = {}
+
+def resolve_weights(weights='yolov8n.pt', weights_dir=None, offline=False):
+    """
+    가중치 파일 경로를 찾습니다.
+    
+    Args:
+        weights: 가중치 파일 이름 또는 경로
+        weights_dir: 로컬 가중치 디렉토리 (None이면 NDVISION_WEIGHTS_DIR 또는 이 예제 폴더)
+        offline: True이면 로컬에 없을 때 다운로드하지 않고 오류 발생
+    
+    Returns:
+        weights_path: 가중치 파일 경로
+    """
+    if os.path.exists(weights):
+        return os.path.abspath(weights)
+    
+    candidate = os.path.join(weights_dir or DEFAULT_WEIGHTS_DIR, weights)
+    if os.path.exists(candidate):
+        return os.path.abspath(candidate)
+    
+    if offline:
+        raise FileNotFoundError(f"로컬 가중치 파일을 찾을 수 없습니다: {candidate}")
+    
+    # ultralytics가 처음 사용할 때 다운로드
+    return weights
+
+def load_model(weights='yolov8n.pt', task=None, imgsz=640, warmup=1, weights_dir=None, offline=False,
+               backend='ultralytics'):
     """
     YOLOv8 사전 훈련된 모델을 로드합니다.
+    
+    같은 (가중치 경로, task, 입력 크기, 백엔드)의 모델은 프로세스 안에서 한 번만 로드하여
+    재사용하며, 로드 직후 더미 이미지로 예열 추론을 실행합니다.
+    
+    Args:
+        weights: 가중치 파일 이름 또는 경로
+        task: 모델 task (None이면 가중치에서 자동 판별)
+        imgsz: 예열 추론 입력 크기
+        warmup: 예열 추론 횟수 (0이면 예열하지 않음)
+        weights_dir: 로컬 가중치 디렉토리
+        offline: True이면 가중치를 다운로드하지 않음
+        backend: 'ultralytics' (기본값), 'opencv' 또는 'onnxruntime'
+            ONNX 백엔드는 torch 없이 export_onnx()로 만든 .onnx 파일을 사용합니다.
+    
+    Returns:
+        model: 로드된 모델 (실패 시 None)
     """
     try:
-        # YOLOv8n (nano) 모델 로드 - 가장 빠르고 가벼운 모델
-        model = YOLO('yolov8n.pt')
-        print("YOLOv8 모델이 성공적으로 로드되었습니다.")
+        if backend not in BACKENDS:
+            raise ValueError(f"알 수 없는 백엔드: {backend} (사용 가능: {BACKENDS})")
+        
+        if backend != 'ultralytics' and weights.endswith('.pt'):
+            weights = os.path.splitext(weights)[0] + '.onnx'
+        # ONNX 가중치는 자동으로 다운로드되지 않음
+        weights_path = resolve_weights(weights, weights_dir, offline or backend != 'ultralytics')
+        key = (weights_path, task, imgsz, backend)
+        if key in _MODEL_CACHE:
+            return _MODEL_CACHE[key]
+        
+        start = time.perf_counter()
+        if backend == 'ultralytics':
+            # 무거운 torch 의존성은 이 백엔드를 쓸 때만 import
+            from ultralytics import YOLO
+            
+            # YOLOv8n (nano) 모델 로드 - 가장 빠르고 가벼운 모델
+            model = YOLO(weights_path, task=task)
+        else:
+            model = OnnxDetector(weights_path, backend=backend, imgsz=imgsz)
+        cold_start = time.perf_counter() - start
+        
+        # 예열 추론 (첫 추론의 초기화 비용을 실제 입력 전에 미리 지불)
+        first_inference = None
+        if warmup > 0:
+            dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+            for i in range(warmup):
+                start = time.perf_counter()
+                model(dummy, imgsz=imgsz, verbose=False)
+                if i == 0:
+                    first_inference = time.perf_counter() - start
+        
+        _MODEL_CACHE[key] = model
+        MODEL_LOAD_STATS[key] = {'cold_start_sec': cold_start, 'first_inference_sec': first_inference}
+        
+        print(f"YOLOv8 모델이 성공적으로 로드되었습니다. (백엔드: {backend})")
+        message = f"모델 로드 시간: {cold_start * 1000:.1f} ms"
+        if first_inference is not None:
+            message += f", 첫 추론 지연 시간: {first_inference * 1000:.1f} ms (예열 {warmup}회)"
+        print(message)
         return model
     except Exception as e:
         print(f"모델 로드 중 오류 발생: {e}")
         return None
 
-def detect_objects(model, image_path):
+def clear_model_cache():
+    """
+    프로세스 모델 캐시를 비웁니다.
+    """
+    _MODEL_CACHE.clear()
+    MODEL_LOAD_STATS.clear()
+
+def inference_options(model=None, conf=0.5, iou=0.7, max_det=300, classes=None):
+    """
+    모델 호출에 그대로 넘길 탐지 옵션을 만듭니다.
+    
+    신뢰도 / 클래스 필터는 모델 안에서 NMS 전에 적용되므로, 그리기 단계에서 걸러내는 것보다
+    NMS와 결과 변환에 들어가는 박스 수가 줄어듭니다.
+    
+    Args:
+        model: 클래스 이름을 ID로 바꿀 때 사용할 모델 (classes에 이름이 없으면 생략 가능)
+        conf: 최소 신뢰도
+        iou: NMS IoU 기준
+        max_det: 이미지당 최대 탐지 수
+        classes: 남길 클래스 ID 또는 이름 목록 (None이면 전체)
+    
+    Returns:
+        options: {'conf', 'iou', 'max_det', 'classes'} - model(image, **options)로 사용
+    """
+    if classes is not None:
+        names = getattr(model, 'names', None) or dict(enumerate(COCO_NAMES))
+        ids = {name: class_id for class_id, name in names.items()}
+        resolved = []
+        for item in classes:
+            if isinstance(item, str) and not item.isdigit():
+                if item not in ids:
+                    raise ValueError(f"알 수 없는 클래스 이름: {item}")
+                resolved.append(ids[item])
+            else:
+                resolved.append(int(item))
+        classes = sorted(set(resolved))
+    return {'conf': conf, 'iou': iou, 'max_det': max_det, 'classes': classes}
+
+def postprocess_ms(model, results):
+    """
+    마지막 추론의 이미지당 후처리 (NMS / 결과 변환) 시간 (ms)
+    
+    ultralytics는 Results.speed, OnnxDetector는 model.speed에서 읽습니다.
+    """
+    if results and not isinstance(results[0], dict):
+        return float(np.mean([result.speed['postprocess'] for result in results]))
+    speed = getattr(model, 'speed', None)
+    return speed['postprocess'] if speed else None
+
+def export_onnx(weights='yolov8n.pt', imgsz=640):
+    """
+    ultralytics 모델을 ONNX로 내보냅니다. (ultralytics가 설치된 PC에서 한 번 실행)
+    
+    Returns:
+        onnx_path: 생성된 .onnx 파일 경로
+    """
+    from ultralytics import YOLO
+    return YOLO(weights).export(format='onnx', imgsz=imgsz, opset=12, simplify=False)
+
+def letterbox(image, new_shape=640, color=(114, 114, 114)):
+    """
+    비율을 유지하며 크기를 조정하고 남는 부분을 채웁니다. (YOLOv8 전처리와 동일)
+    
+    Returns:
+        padded: new_shape x new_shape 이미지
+        ratio: 크기 조정 비율
+        pad: (왼쪽, 위쪽) 여백
+    """
+    height, width = image.shape[:2]
+    ratio = min(new_shape / height, new_shape / width)
+    new_width, new_height = int(round(width * ratio)), int(round(height * ratio))
+    pad_x, pad_y = (new_shape - new_width) / 2, (new_shape - new_height) / 2
+    
+    if (width, height) != (new_width, new_height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    padded = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+    return padded, ratio, (left, top)
+
+def nms_numpy(boxes, scores, iou_threshold=0.7, metric='iou'):
+    """
+    NumPy 비최대 억제 (NMS)
+    
+    Args:
+        boxes: (N, 4) xyxy 좌표
+        scores: (N,) 점수
+        iou_threshold: 겹침 제거 기준
+        metric: 'iou' (교집합 / 합집합) 또는 'ios' (교집합 / 작은 박스 넓이)
+            'ios'는 타일 경계에서 잘린 박스가 전체 박스 안에 들어가는 경우도 제거합니다.
+    
+    Returns:
+        keep: 남길 박스의 인덱스 (점수 내림차순)
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.maximum(x2 - x1, 0) * np.maximum(y2 - y1, 0)
+    # 점수 내림차순, 같은 점수면 큰 박스 우선 (타일 경계에서 잘린 박스보다 전체 박스를 남김)
+    order = np.lexsort((-areas, -scores))
+    
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        
+        inter_w = np.maximum(0.0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        inter_h = np.maximum(0.0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = inter_w * inter_h
+        if metric == 'ios':
+            overlap = inter / (np.minimum(areas[i], areas[rest]) + 1e-7)
+        else:
+            overlap = inter / (areas[i] + areas[rest] - inter + 1e-7)
+        order = rest[overlap <= iou_threshold]
+    
+    return np.array(keep, dtype=int)
+
+def batched_nms_numpy(boxes, scores, class_ids, iou_threshold=0.7, metric='iou'):
+    """
+    클래스별 NMS - 클래스마다 좌표를 멀리 떨어뜨려 한 번의 NMS로 처리합니다.
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=int)
+    # 좌표 범위(최대 - 최소)보다 크게 떨어뜨려야 음수 좌표가 있어도 다른 클래스 박스끼리 겹치지 않음
+    offsets = class_ids[:, None].astype(np.float32) * (boxes.max() - boxes.min() + 1)
+    return nms_numpy(boxes + offsets, scores, iou_threshold, metric)
+
+class OnnxDetector:
+    """
+    ONNX로 내보낸 YOLOv8 모델을 cv2.dnn 또는 onnxruntime으로 실행하는 CPU 탐지기
+    
+    model(images)로 호출하며, 결과는 이미지마다 detections_from_results()와 같은
+    딕셔너리 {'xyxy', 'conf', 'cls', 'names'} 의 리스트입니다.
+    """
+    
+    def __init__(self, model_path, backend='opencv', imgsz=640, names=None):
+        """
+        Args:
+            model_path: .onnx 파일 경로
+            backend: 'opencv' (cv2.dnn) 또는 'onnxruntime'
+            imgsz: 모델 입력 크기
+            names: {클래스 ID: 이름} (None이면 모델 메타데이터 또는 COCO 이름)
+        """
+        self.backend = backend
+        self.imgsz = imgsz
+        self.weights_path = model_path
+        
+        if backend == 'onnxruntime':
+            import onnxruntime
+            self.session = onnxruntime.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+            self.input_name = self.session.get_inputs()[0].name
+            metadata = self.session.get_modelmeta().custom_metadata_map
+            if names is None and 'names' in metadata:
+                # ultralytics가 내보낸 모델은 클래스 이름을 메타데이터에 저장함
+                names = ast.literal_eval(metadata['names'])
+        else:
+            self.net = cv2.dnn.readNetFromONNX(model_path)
+        
+        self.names = names or dict(enumerate(COCO_NAMES))
+        # 마지막 호출의 이미지당 단계별 시간 (ms, ultralytics Results.speed와 같은 형식)
+        self.speed = None
+    
+    def __call__(self, images, conf=0.25, iou=0.7, max_det=300, classes=None, verbose=False, **kwargs):
+        """
+        이미지(또는 이미지 리스트)에서 객체를 탐지합니다.
+        
+        Args:
+            images: BGR 이미지 또는 이미지 리스트
+            conf: 최소 신뢰도
+            iou: NMS IoU 기준
+            max_det: 이미지당 최대 탐지 수
+            classes: 남길 클래스 ID 목록 (None이면 전체)
+        
+        Returns:
+            results: 이미지마다 탐지 결과 딕셔너리의 리스트
+        """
+        if not isinstance(images, (list, tuple)):
+            images = [images]
+        
+        timings = np.zeros(3)
+        results = []
+        for image in images:
+            detections, elapsed = self._detect(image, conf, iou, max_det, classes)
+            results.append(detections)
+            timings += elapsed
+        timings = timings * 1000 / max(len(images), 1)
+        self.speed = dict(zip(('preprocess', 'inference', 'postprocess'), timings.tolist()))
+        return results
+    
+    def _forward(self, blob):
+        """전처리된 입력으로 모델을 실행합니다."""
+        if self.backend == 'onnxruntime':
+            return self.session.run(None, {self.input_name: blob})[0]
+        self.net.setInput(blob)
+        return self.net.forward()
+    
+    def _detect(self, image, conf, iou, max_det, classes):
+        # 전처리: letterbox, BGR -> RGB, 0~1 정규화, NCHW
+        t0 = time.perf_counter()
+        padded, ratio, (pad_x, pad_y) = letterbox(image, self.imgsz)
+        blob = cv2.dnn.blobFromImage(padded, 1 / 255.0, swapRB=True)
+        t1 = time.perf_counter()
+        
+        # 출력 (1, 4 + 클래스 수, 후보 수) -> (후보 수, 4 + 클래스 수)
+        output = self._forward(blob)[0].T
+        t2 = time.perf_counter()
+        class_scores = output[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+        
+        # NMS 전에 신뢰도 / 클래스로 후보를 줄임
+        mask = scores >= conf
+        if classes is not None:
+            mask &= np.isin(class_ids, classes)
+        boxes, scores, class_ids = output[mask, :4], scores[mask], class_ids[mask]
+        
+        # (cx, cy, w, h) -> (x1, y1, x2, y2)
+        xyxy = np.empty_like(boxes)
+        xyxy[:, :2] = boxes[:, :2] - boxes[:, 2:] / 2
+        xyxy[:, 2:] = boxes[:, :2] + boxes[:, 2:] / 2
+        
+        keep = batched_nms_numpy(xyxy, scores, class_ids, iou)[:max_det]
+        xyxy, scores, class_ids = xyxy[keep], scores[keep], class_ids[keep]
+        
+        # letterbox 좌표를 원본 이미지 좌표로 되돌림
+        xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad_x) / ratio).clip(0, image.shape[1])
+        xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad_y) / ratio).clip(0, image.shape[0])
+        
+        detections = {
+            'xyxy': xyxy.astype(np.float32),
+            'conf': scores.astype(np.float32),
+            'cls': class_ids.astype(int),
+            'names': self.names,
+        }
+        return detections, (t1 - t0, t2 - t1, time.perf_counter() - t2)
+
+def detect_objects(model, image_path, sliced=False, tile_size=640, overlap=0.2, cache=None, options=None):
     """
     이미지에서 객체를 탐지합니다.
     
     Args:
         model: 로드된 YOLO 모델
         image_path: 입력 이미지 경로
+        sliced: True이면 겹치는 타일로 나누어 탐지 (고해상도 이미지의 작은 객체용)
+        tile_size: 타일 크기 (sliced=True일 때)
+        overlap: 타일 겹침 비율 (sliced=True일 때)
+        cache: cache.DetectionCache (같은 이미지 / 모델 / 파라미터의 결과가 있으면 추론을 건너뜀)
+        options: inference_options()의 탐지 옵션 (None이면 기본값)
     
     Returns:
-        results: 탐지 결과
+        results: 탐지 결과 (캐시에서 읽은 경우 detections_from_results() 형식)
         image: 원본 이미지
     """
     try:
@@ -41,9 +395,28 @@ def detect_objects(model, image_path):
             print(f"이미지를 로드할 수 없습니다: {image_path}")
             return None, None
         
+        options = options or inference_options(model)
+        
+        # 캐시 확인
+        key = results = None
+        if cache is not None:
+            params = dict(options, sliced=sliced, tile_size=tile_size, overlap=overlap) if sliced else options
+            key = cache.key(model, image, params)
+            results = cache.get(key)
+            if results is not None:
+                print("캐시된 탐지 결과를 사용합니다.")
+        
         # 객체 탐지 수행
-        results = model(image)
-        print(f"객체 탐지가 완료되었습니다. {len(results[0].boxes)} 개의 객체가 탐지되었습니다.")
+        if results is None:
+            if sliced:
+                results, tile_stats = detect_objects_sliced(model, image, tile_size, overlap, options=options)
+                print(f"타일 {tile_stats['tiles']}개 중 빈 타일 {tile_stats['skipped']}개를 건너뛰었습니다.")
+            else:
+                results = model(image, verbose=False, **options)
+            if cache is not None:
+                cache.put(key, detections_from_results(results))
+        detections = detections_from_results(results)
+        print(f"객체 탐지가 완료되었습니다. {len(detections['conf'])} 개의 객체가 탐지되었습니다.")
         
         return results, image
     
@@ -51,13 +424,132 @@ def detect_objects(model, image_path):
         print(f"객체 탐지 중 오류 발생: {e}")
         return None, None
 
-def draw_detections(image, results):
+def detections_from_results(results):
+    """
+    YOLO 탐지 결과를 NumPy 배열로 한 번에 변환합니다.
+    박스마다 .cpu().numpy()를 호출하지 않고 전체 Boxes 텐서를 한 번만 옮깁니다.
+    
+    Args:
+        results: YOLO 탐지 결과, OnnxDetector 결과 또는 이미 변환된 딕셔너리
+    
+    Returns:
+        detections: {'xyxy': (N, 4) 좌표, 'conf': (N,) 신뢰도,
+                     'cls': (N,) 클래스 ID, 'names': {클래스 ID: 이름}}
+    """
+    if isinstance(results, dict):
+        return results
+    if isinstance(results[0], dict):
+        return results[0]
+    
+    boxes = results[0].boxes
+    # data 열 구성: x1, y1, x2, y2, [track_id], conf, cls
+    data = boxes.data.cpu().numpy()
+    return {
+        'xyxy': data[:, :4],
+        'conf': data[:, -2],
+        'cls': data[:, -1].astype(int),
+        'names': results[0].names,
+    }
+
+def slice_offsets(length, tile_size, overlap):
+    """
+    한 축을 겹치는 타일로 나눈 시작 좌표 목록 (마지막 타일은 끝에 맞춤)
+    """
+    if length <= tile_size:
+        return [0]
+    stride = max(int(tile_size * (1 - overlap)), 1)
+    offsets = list(range(0, length - tile_size, stride))
+    offsets.append(length - tile_size)
+    return offsets
+
+def detect_objects_sliced(model, image, tile_size=640, overlap=0.2, batch_size=16, min_std=4.0,
+                          merge_threshold=0.5, include_full=True, options=None):
+    """
+    고해상도 이미지를 겹치는 타일로 잘라 탐지하고 결과를 합칩니다. (작은 객체 탐지용)
+    
+    타일들은 batch_size 개씩 한 번의 model([...]) 호출로 추론하며,
+    밝기 변화가 거의 없는 (표준편차 < min_std) 빈 타일은 추론하지 않습니다.
+    타일 경계에서 중복된 박스는 클래스별 NMS (작은 박스 기준 겹침, IoS)로 합칩니다.
+    
+    Args:
+        model: 로드된 탐지 모델
+        image: BGR 이미지
+        tile_size: 타일 크기 (픽셀)
+        overlap: 이웃 타일과 겹치는 비율 (0 이상 1 미만)
+        batch_size: 한 번에 추론할 타일 수
+        min_std: 타일을 추론할 최소 밝기 표준편차 (0이면 건너뛰지 않음)
+        merge_threshold: 중복 박스를 합치는 겹침 기준
+        include_full: 큰 객체를 위해 이미지 전체도 함께 추론할지 여부
+        options: inference_options()의 탐지 옵션 (None이면 기본값, max_det은 합친 뒤에도 적용)
+    
+    Returns:
+        detections: detections_from_results() 형식의 탐지 결과
+        stats: {'tiles': 전체 타일 수, 'skipped': 건너뛴 타일 수}
+    """
+    if tile_size <= 0:
+        raise ValueError(f"tile_size는 0보다 커야 합니다: {tile_size}")
+    if not 0 <= overlap < 1:
+        raise ValueError(f"overlap은 0 이상 1 미만이어야 합니다: {overlap}")
+    
+    options = options or inference_options(model)
+    height, width = image.shape[:2]
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    
+    tiles = []
+    skipped = 0
+    for y in slice_offsets(height, tile_size, overlap):
+        for x in slice_offsets(width, tile_size, overlap):
+            # 빈 타일 검사는 4픽셀 간격으로 표본을 뽑아 계산
+            _, std = cv2.meanStdDev(gray[y:y + tile_size:4, x:x + tile_size:4])
+            if std[0, 0] < min_std:
+                skipped += 1
+                continue
+            tiles.append((x, y))
+    
+    boxes, scores, class_ids = [], [], []
+    names = {}
+    
+    def collect(results, offsets):
+        for result, (x, y) in zip(results, offsets):
+            detections = detections_from_results([result])
+            names.update(detections['names'])
+            boxes.append(detections['xyxy'] + np.array([x, y, x, y], dtype=np.float32))
+            scores.append(detections['conf'])
+            class_ids.append(detections['cls'])
+    
+    for start in range(0, len(tiles), batch_size):
+        batch = tiles[start:start + batch_size]
+        crops = [image[y:y + tile_size, x:x + tile_size] for x, y in batch]
+        collect(model(crops, verbose=False, **options), batch)
+    
+    if include_full:
+        collect(model([image], verbose=False, **options), [(0, 0)])
+    
+    if boxes:
+        boxes = np.concatenate(boxes).astype(np.float32)
+        scores = np.concatenate(scores).astype(np.float32)
+        class_ids = np.concatenate(class_ids).astype(int)
+    else:
+        boxes, scores, class_ids = np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, int)
+    
+    keep = batched_nms_numpy(boxes, scores, class_ids, merge_threshold, metric='ios')[:options['max_det']]
+    detections = {'xyxy': boxes[keep], 'conf': scores[keep], 'cls': class_ids[keep], 'names': names}
+    return detections, {'tiles': len(tiles) + skipped, 'skipped': skipped}
+
+@lru_cache(maxsize=4096)
+def _label_text_size(label, font, font_scale, thickness):
+    """레이블 텍스트 크기 (같은 레이블은 한 번만 계산)"""
+    return cv2.getTextSize(label, font, font_scale, thickness)
+
+def draw_detections(image, results, conf_threshold=0.5, verbose=True):
     """
     탐지된 객체에 바운딩 박스와 레이블을 그립니다.
     
     Args:
         image: 원본 이미지
-        results: YOLO 탐지 결과
+        results: YOLO 탐지 결과 또는 detections_from_results()의 결과
+        conf_threshold: 표시할 최소 신뢰도 (None이면 추론에서 이미 걸렀다고 보고 모두 표시)
+        verbose: 탐지된 객체마다 콘솔에 출력할지 여부
     
     Returns:
         annotated_image: 어노테이션이 추가된 이미지
@@ -66,45 +558,50 @@ def draw_detections(image, results):
         # 이미지 복사본 생성
         annotated_image = image.copy()
         
+        # 탐지 결과를 NumPy 배열로 한 번에 변환
+        detections = detections_from_results(results)
+        
         # 탐지 결과가 있는지 확인
-        if len(results[0].boxes) == 0:
-            print("탐지된 객체가 없습니다.")
+        if len(detections['conf']) == 0:
+            if verbose:
+                print("탐지된 객체가 없습니다.")
             return annotated_image
         
+        # 신뢰도가 기준 이상인 객체만 미리 골라냄
+        boxes, confidences, class_ids = detections['xyxy'], detections['conf'], detections['cls']
+        if conf_threshold is not None:
+            keep = confidences >= conf_threshold
+            boxes, confidences, class_ids = boxes[keep], confidences[keep], class_ids[keep]
+        boxes = boxes.astype(int)
+        names = detections['names']
+        
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        font_scale = 0.6
+        thickness = 2
+        
         # 각 탐지된 객체에 대해 처리
-        for box in results[0].boxes:
-            # 바운딩 박스 좌표 추출
-            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().astype(int)
-            
-            # 신뢰도 점수
-            confidence = box.conf[0].cpu().numpy()
-            
-            # 클래스 ID와 이름
-            class_id = int(box.cls[0].cpu().numpy())
-            class_name = results[0].names[class_id]
-            
-            # 신뢰도가 0.5 이상인 경우만 표시
-            if confidence >= 0.5:
-                # 바운딩 박스 그리기 (초록색)
-                cv2.rectangle(annotated_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                
-                # 레이블 텍스트 생성
-                label = f"{class_name}: {confidence:.2f}"
-                
-                # 텍스트 크기 계산
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                font_scale = 0.6
-                thickness = 2
-                (text_width, text_height), _ = cv2.getTextSize(label, font, font_scale, thickness)
-                
-                # 텍스트 배경 사각형 그리기
-                cv2.rectangle(annotated_image, (x1, y1 - text_height - 10), 
-                             (x1 + text_width, y1), (0, 255, 0), -1)
-                
-                # 텍스트 그리기 (검은색)
-                cv2.putText(annotated_image, label, (x1, y1 - 5), 
-                           font, font_scale, (0, 0, 0), thickness)
-                
+        for (x1, y1, x2, y2), confidence, class_id in zip(boxes.tolist(), confidences.tolist(),
+                                                          class_ids.tolist()):
+            class_name = names[class_id]
+            
+            # 바운딩 박스 그리기 (초록색)
+            cv2.rectangle(annotated_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            
+            # 레이블 텍스트 생성
+            label = f"{class_name}: {confidence:.2f}"
+            
+            # 텍스트 크기 계산 (캐시)
+            (text_width, text_height), _ = _label_text_size(label, font, font_scale, thickness)
+            
+            # 텍스트 배경 사각형 그리기
+            cv2.rectangle(annotated_image, (x1, y1 - text_height - 10), 
+                         (x1 + text_width, y1), (0, 255, 0), -1)
+            
+            # 텍스트 그리기 (검은색)
+            cv2.putText(annotated_image, label, (x1, y1 - 5), 
+                       font, font_scale, (0, 0, 0), thickness)
+            
+            if verbose:
                 print(f"탐지된 객체: {class_name} (신뢰도: {confidence:.2f})")
         
         return annotated_image
@@ -130,16 +627,517 @@ def save_output(image, output_path):
     except Exception as e:
         print(f"이미지 저장 중 오류 발생: {e}")
 
+def collect_image_paths(inputs):
+    """
+    디렉토리, glob 패턴, 파일 목록에서 처리할 이미지 경로를 수집합니다.
+    
+    Args:
+        inputs: 디렉토리 경로, glob 패턴 또는 파일 경로 (문자열 또는 리스트)
+    
+    Returns:
+        paths: 정렬되고 중복이 제거된 이미지 경로 리스트
+    """
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for name in os.listdir(item):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.join(item, name))
+        elif glob.has_magic(item):
+            paths.extend(p for p in glob.glob(item, recursive=True)
+                         if p.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            paths.append(item)
+    
+    return sorted(set(paths))
+
+def detect_objects_batch(model, inputs, batch_size=8, num_threads=4, draw=True, options=None, cache=None):
+    """
+    여러 이미지를 배치로 묶어 한 번의 model([...]) 호출로 탐지합니다.
+    다음 배치의 이미지는 스레드 풀에서 미리 디코딩됩니다.
+    
+    Args:
+        model: 로드된 YOLO 모델
+        inputs: 이미지 경로 리스트, 디렉토리 또는 glob 패턴
+        batch_size: 한 번에 추론할 이미지 수
+        num_threads: 이미지 디코딩 스레드 수
+        draw: 어노테이션 이미지를 만들지 여부
+        options: inference_options()의 탐지 옵션 (None이면 기본값)
+        cache: cache.DetectionCache (캐시에 있는 이미지는 배치에서 빠지고 추론하지 않음)
+    
+    Yields:
+        (이미지 경로, 어노테이션 이미지 또는 None, detections)
+    """
+    paths = collect_image_paths(inputs)
+    return detect_image_batches(model, paths, batch_size, num_threads, draw, options, cache)
+
+def detect_image_batches(model, paths, batch_size=8, num_threads=4, draw=True, options=None, cache=None):
+    """
+    이미지 경로 목록을 주어진 순서 그대로 배치 탐지합니다. (detect_objects_batch() 참고)
+    """
+    options = options or inference_options(model)
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        # 현재 배치를 추론하는 동안 다음 배치를 디코딩 (메모리는 최대 2배치)
+        futures = [executor.submit(cv2.imread, path) for path in batches[0]] if batches else []
+        for index, batch in enumerate(batches):
+            images = [future.result() for future in futures]
+            if index + 1 < len(batches):
+                futures = [executor.submit(cv2.imread, path) for path in batches[index + 1]]
+            
+            valid = []
+            for path, image in zip(batch, images):
+                if image is None:
+                    print(f"이미지를 로드할 수 없습니다: {path}")
+                else:
+                    valid.append((path, image))
+            if not valid:
+                continue
+            
+            # 캐시에 없는 이미지만 모아 배치 전체를 한 번에 추론
+            keys = [cache.key(model, image, options) for _, image in valid] if cache is not None else [None] * len(valid)
+            cached = [cache.get(key) for key in keys] if cache is not None else [None] * len(valid)
+            missing = [image for (_, image), hit in zip(valid, cached) if hit is None]
+            results = iter(model(missing, verbose=False, **options) if missing else [])
+            
+            for (path, image), key, detections in zip(valid, keys, cached):
+                if detections is None:
+                    detections = detections_from_results([next(results)])
+                    if cache is not None:
+                        cache.put(key, detections)
+                annotated = draw_detections(image, detections, None, verbose=False) if draw else None
+                yield path, annotated, detections
+
+def run_batch(model, inputs, output_dir, batch_size=8, num_threads=4, export_dir=None, export_format=None,
+              save_images=True, cache=None, options=None):
+    """
+    배치 탐지 결과를 출력 디렉토리에 저장하고 처리량을 출력합니다.
+    
+    Args:
+        export_dir: 탐지 결과를 열 단위 데이터로 저장할 디렉토리 (export.DetectionWriter, None이면 저장 안 함)
+        export_format: 'npy', 'parquet' 또는 'jsonl' (None이면 기존 형식 또는 'npy')
+        save_images: 어노테이션 이미지를 저장할지 여부
+        cache: cache.DetectionCache (None이면 캐시를 사용하지 않음)
+        options: inference_options()의 탐지 옵션 (None이면 기본값)
+    
+    Returns:
+        images_per_sec: 초당 처리 이미지 수
+    """
+    if save_images:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    writer = None
+    if export_dir is not None:
+        from export import DetectionWriter
+        writer = DetectionWriter(export_dir, export_format)
+    
+    count = 0
+    start = time.perf_counter()
+    try:
+        for path, annotated, detections in detect_objects_batch(model, inputs, batch_size, num_threads,
+                                                                draw=save_images, options=options, cache=cache):
+            if save_images:
+                output_path = os.path.join(output_dir, os.path.basename(path))
+                if not cv2.imwrite(output_path, annotated):
+                    print(f"이미지 저장에 실패했습니다: {output_path}")
+            if writer is not None:
+                writer.add(path, detections)
+            count += 1
+    finally:
+        if writer is not None:
+            writer.close()
+            print(f"탐지 결과가 저장되었습니다: {export_dir} ({writer.format})")
+    elapsed = time.perf_counter() - start
+    
+    images_per_sec = count / elapsed if elapsed > 0 else 0.0
+    print(f"배치 탐지 완료: {count}개 이미지, {elapsed:.2f}초, {images_per_sec:.2f} images/sec (배치 크기 {batch_size})")
+    return images_per_sec
+
+def box_iou(boxes1, boxes2):
+    """(N, 4)와 (M, 4) xyxy 박스의 IoU 행렬 (N, M)"""
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area1 = np.prod(boxes1[:, 2:] - boxes1[:, :2], axis=1)
+    area2 = np.prod(boxes2[:, 2:] - boxes2[:, :2], axis=1)
+    return inter / (area1[:, None] + area2[None, :] - inter + 1e-7)
+
+class IoUTracker:
+    """
+    IoU 매칭과 등속 운동 예측으로 탐지 사이의 프레임에 박스를 이어 주는 가벼운 추적기
+    
+    탐지 결과가 들어오면 update()로 트랙을 갱신하고, 탐지가 없는 프레임에서는
+    predict()가 마지막 탐지 위치 + 속도 x 경과 프레임 수로 박스를 옮깁니다.
+    """
+    
+    def __init__(self, iou_threshold=0.3, max_misses=2, velocity_smoothing=0.5):
+        """
+        Args:
+            iou_threshold: 같은 객체로 볼 최소 IoU
+            max_misses: 연속으로 탐지되지 않으면 트랙을 지우는 탐지 횟수
+            velocity_smoothing: 이전 속도를 유지하는 비율 (0이면 최신 속도만 사용)
+        """
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.velocity_smoothing = velocity_smoothing
+        self.names = {}
+        self.reset()
+    
+    def reset(self):
+        """모든 트랙을 지웁니다."""
+        # 트랙 상태 배열: 마지막 탐지 박스 / 탐지 프레임 / 프레임당 속도 / 신뢰도 / 클래스 / 놓친 횟수
+        self.anchors = np.zeros((0, 4), dtype=np.float32)
+        self.anchor_frames = np.zeros(0, dtype=np.int64)
+        self.velocities = np.zeros((0, 4), dtype=np.float32)
+        self.conf = np.zeros(0, dtype=np.float32)
+        self.cls = np.zeros(0, dtype=int)
+        self.misses = np.zeros(0, dtype=int)
+    
+    def _boxes_at(self, frame_index):
+        steps = (frame_index - self.anchor_frames).astype(np.float32)[:, None]
+        return self.anchors + self.velocities * steps
+    
+    def update(self, detections, frame_index):
+        """
+        frame_index 프레임에서 얻은 탐지 결과로 트랙을 갱신합니다.
+        
+        Args:
+            detections: detections_from_results() 형식의 탐지 결과
+            frame_index: 탐지에 사용한 프레임 번호 (비동기 추론이면 현재 프레임보다 이전)
+        """
+        boxes = detections['xyxy'].astype(np.float32)
+        self.names = detections['names']
+        
+        # 같은 클래스끼리 IoU가 높은 쌍부터 탐욕적으로 매칭
+        matched_tracks = np.full(len(boxes), -1)
+        if len(boxes) and len(self.anchors):
+            ious = box_iou(boxes, self._boxes_at(frame_index))
+            ious[detections['cls'][:, None] != self.cls[None, :]] = 0
+            for flat in np.argsort(-ious, axis=None):
+                det, track = np.unravel_index(flat, ious.shape)
+                if ious[det, track] < self.iou_threshold:
+                    break
+                if matched_tracks[det] < 0 and track not in matched_tracks:
+                    matched_tracks[det] = track
+        
+        # 매칭된 트랙: 두 탐지 사이의 이동량으로 속도 갱신
+        hit = matched_tracks >= 0
+        tracks = matched_tracks[hit]
+        steps = np.maximum(frame_index - self.anchor_frames[tracks], 1).astype(np.float32)[:, None]
+        velocity = (boxes[hit] - self.anchors[tracks]) / steps
+        self.velocities[tracks] = (self.velocity_smoothing * self.velocities[tracks] +
+                                   (1 - self.velocity_smoothing) * velocity)
+        self.anchors[tracks] = boxes[hit]
+        self.anchor_frames[tracks] = frame_index
+        self.conf[tracks] = detections['conf'][hit]
+        self.misses[tracks] = 0
+        
+        # 매칭되지 않은 트랙은 놓친 횟수를 늘리고 오래된 트랙은 제거
+        missed = np.ones(len(self.anchors), dtype=bool)
+        missed[tracks] = False
+        self.misses[missed] += 1
+        alive = self.misses <= self.max_misses
+        
+        # 새 객체는 속도 0인 트랙으로 추가
+        new = ~hit
+        self.anchors = np.concatenate([self.anchors[alive], boxes[new]])
+        self.anchor_frames = np.concatenate([self.anchor_frames[alive], np.full(new.sum(), frame_index)])
+        self.velocities = np.concatenate([self.velocities[alive], np.zeros((new.sum(), 4), np.float32)])
+        self.conf = np.concatenate([self.conf[alive], detections['conf'][new].astype(np.float32)])
+        self.cls = np.concatenate([self.cls[alive], detections['cls'][new]])
+        self.misses = np.concatenate([self.misses[alive], np.zeros(new.sum(), dtype=int)])
+    
+    def predict(self, frame_index):
+        """
+        frame_index 프레임의 예상 박스를 detections_from_results() 형식으로 반환합니다.
+        """
+        return {
+            'xyxy': self._boxes_at(frame_index),
+            'conf': self.conf.copy(),
+            'cls': self.cls.copy(),
+            'names': self.names,
+        }
+
+class FrameGrabber:
+    """
+    캡처 스레드에서 프레임을 읽어 작은 큐에 넣습니다.
+    
+    drop=True이면 큐가 가득 찼을 때 가장 오래된 프레임을 버리므로, 처리가 느려도
+    지연 시간이 쌓이지 않고 항상 최신에 가까운 프레임을 받습니다.
+    """
+    
+    def __init__(self, source, queue_size=2, drop=True):
+        """
+        Args:
+            source: 카메라 번호, 동영상 파일 경로 또는 스트림 URL
+            queue_size: 대기 프레임 수
+            drop: 큐가 가득 찼을 때 가장 오래된 프레임을 버릴지 여부
+        """
+        self.capture = cv2.VideoCapture(source)
+        if not self.capture.isOpened():
+            raise IOError(f"동영상 소스를 열 수 없습니다: {source}")
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.drop = drop
+        self.dropped = 0
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._reader, daemon=True)
+        self.thread.start()
+    
+    def _reader(self):
+        while not self.stopped.is_set():
+            ok, frame = self.capture.read()
+            if not ok:
+                break
+            self._put((frame, time.perf_counter()))
+        
+        # 종료 표시
+        self._put(None)
+    
+    def _put(self, item):
+        while True:
+            try:
+                # 드롭 모드에서는 기다리지 않음 (기다리는 동안 카메라 드라이버 버퍼에 프레임이 쌓임)
+                if self.drop:
+                    self.frames.put_nowait(item)
+                else:
+                    self.frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if not (self.drop or self.stopped.is_set()):
+                    continue
+            # 가장 오래된 프레임을 버리고 자리를 만듦
+            try:
+                self.frames.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+    
+    def read(self):
+        """
+        다음 프레임을 반환합니다.
+        
+        Returns:
+            (frame, 캡처 시각) 또는 스트림이 끝나면 None
+        """
+        return self.frames.get()
+    
+    def release(self):
+        """캡처 스레드를 멈추고 장치를 해제합니다."""
+        self.stopped.set()
+        self.thread.join(timeout=1.0)
+        self.capture.release()
+
+def _timed_detection(model, frame, options):
+    """추론 스레드 작업: 탐지 결과와 추론 시간(초)을 반환합니다."""
+    start = time.perf_counter()
+    detections = detections_from_results(model(frame, verbose=False, **options))
+    return detections, time.perf_counter() - start
+
+def stream_detection(model, source=0, output_path=None, show=True, options=None,
+                     max_interval=10, drop_frames=None, queue_size=2):
+    """
+    카메라 / 동영상에서 실시간으로 객체를 탐지합니다.
+    
+    캡처 스레드가 프레임을 읽고, 추론은 별도 스레드에서 비동기로 실행됩니다.
+    추론이 진행되는 동안의 프레임은 IoUTracker가 박스를 이어 그리며,
+    N 프레임마다 탐지하는 간격 N은 측정된 추론 시간 x 소스 FPS에 맞춰 자동으로 조정됩니다.
+    
+    Args:
+        model: 로드된 탐지 모델
+        source: 카메라 번호, 동영상 파일 경로 또는 스트림 URL
+        output_path: 어노테이션 동영상 저장 경로 (None이면 저장하지 않음)
+        show: 화면에 표시할지 여부 ('q' 키로 종료)
+        options: inference_options()의 탐지 옵션 (None이면 기본값)
+        max_interval: 탐지 간격의 최댓값 (프레임)
+        drop_frames: 처리가 밀릴 때 오래된 프레임을 버릴지 여부 (None이면 동영상 파일이 아닐 때만)
+        queue_size: 캡처 큐 크기
+    
+    Returns:
+        stats: 처리 통계 딕셔너리 (실패 시 None)
+    """
+    options = options or inference_options(model)
+    if drop_frames is None:
+        drop_frames = not (isinstance(source, str) and os.path.isfile(source))
+    
+    try:
+        grabber = FrameGrabber(source, queue_size, drop_frames)
+    except Exception as e:
+        print(f"동영상 스트림 시작 중 오류 발생: {e}")
+        return None
+    
+    tracker = IoUTracker()
+    executor = ThreadPoolExecutor(max_workers=1)
+    writer = None
+    
+    stats = {'frames': 0, 'detections': 0, 'inference_ms': 0.0, 'latency_ms': 0.0}
+    pending = None
+    pending_frame = 0
+    last_submit = None
+    inference_time = None
+    interval = 1
+    start = time.perf_counter()
+    try:
+        while True:
+            item = grabber.read()
+            if item is None:
+                break
+            frame, captured_at = item
+            frame_index = stats['frames']
+            
+            # 끝난 추론 결과를 추적기에 반영하고 추론 시간으로 탐지 간격을 조정
+            # (프레임을 버리지 않는 파일 처리에서는 간격이 지나면 결과를 기다려 N 프레임 주기를 지킴)
+            if pending is not None and (pending.done() or
+                                        (not drop_frames and frame_index - pending_frame >= interval)):
+                detections, elapsed = pending.result()
+                tracker.update(detections, pending_frame)
+                pending = None
+                stats['detections'] += 1
+                stats['inference_ms'] += elapsed * 1000
+                inference_time = elapsed if inference_time is None else 0.8 * inference_time + 0.2 * elapsed
+                interval = int(min(max(np.ceil(inference_time * grabber.fps), 1), max_interval))
+            
+            # 추론 스레드가 비어 있고 간격이 지났으면 이 프레임으로 다음 탐지를 시작
+            if pending is None and (last_submit is None or frame_index - last_submit >= interval):
+                pending = executor.submit(_timed_detection, model, frame, options)
+                pending_frame = last_submit = frame_index
+            
+            annotated = draw_detections(frame, tracker.predict(frame_index), None, verbose=False)
+            stats['frames'] += 1
+            stats['latency_ms'] += (time.perf_counter() - captured_at) * 1000
+            
+            fps = stats['frames'] / max(time.perf_counter() - start, 1e-6)
+            cv2.putText(annotated, f"FPS: {fps:.1f}  detect every {interval}", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+            
+            if output_path is not None:
+                if writer is None:
+                    height, width = annotated.shape[:2]
+                    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'),
+                                             grabber.fps, (width, height))
+                writer.write(annotated)
+            
+            if show:
+                cv2.imshow('Object Detection', annotated)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+    finally:
+        grabber.release()
+        executor.shutdown(wait=True)
+        if writer is not None:
+            writer.release()
+        if show:
+            cv2.destroyAllWindows()
+    
+    elapsed = time.perf_counter() - start
+    frames = max(stats['frames'], 1)
+    stats.update({
+        'fps': stats['frames'] / elapsed if elapsed > 0 else 0.0,
+        'dropped': grabber.dropped,
+        'interval': interval,
+        'inference_ms': stats['inference_ms'] / max(stats['detections'], 1),
+        'latency_ms': stats['latency_ms'] / frames,
+    })
+    print(f"스트림 탐지 완료: {stats['frames']}프레임, {stats['fps']:.1f} FPS, "
+          f"탐지 {stats['detections']}회 (평균 {stats['inference_ms']:.1f} ms), "
+          f"버린 프레임 {stats['dropped']}개, 평균 지연 {stats['latency_ms']:.1f} ms")
+    return stats
+
+def parse_args():
+    """
+    명령행 인자를 파싱합니다.
+    """
+    parser = argparse.ArgumentParser(description="YOLOv8 객체 탐지")
+    parser.add_argument('--batch', nargs='+', metavar='INPUT',
+                        help="배치 모드 입력 (디렉토리, glob 패턴 또는 파일 목록)")
+    parser.add_argument('--output-dir', default='output', help="배치 모드 결과 디렉토리")
+    parser.add_argument('--batch-size', type=int, default=8, help="한 번에 추론할 이미지 수")
+    parser.add_argument('--threads', type=int, default=4, help="이미지 디코딩 스레드 수")
+    parser.add_argument('--export', default=None, metavar='DIR',
+                        help="배치 탐지 결과를 열 단위 데이터로 저장할 디렉토리")
+    parser.add_argument('--export-format', default=None, choices=('npy', 'parquet', 'jsonl'),
+                        help="탐지 결과 저장 형식 (기본값: npy)")
+    parser.add_argument('--no-images', action='store_true', help="배치 모드에서 어노테이션 이미지를 저장하지 않음")
+    parser.add_argument('--cache', default=None, metavar='DIR', help="탐지 결과 디스크 캐시 디렉토리")
+    parser.add_argument('--cache-size', type=int, default=512, help="캐시 최대 크기 (MB)")
+    parser.add_argument('--weights', default='yolov8n.pt', help="가중치 파일 이름 또는 경로")
+    parser.add_argument('--weights-dir', default=None, help="로컬 가중치 디렉토리")
+    parser.add_argument('--offline', action='store_true', help="가중치를 다운로드하지 않음")
+    parser.add_argument('--warmup', type=int, default=1, help="모델 예열 추론 횟수")
+    parser.add_argument('--backend', default='ultralytics', choices=BACKENDS,
+                        help="탐지 백엔드 (opencv/onnxruntime은 .onnx 가중치 사용)")
+    parser.add_argument('--video', default=None,
+                        help="실시간 탐지 소스 (카메라 번호, 동영상 파일 또는 스트림 URL)")
+    parser.add_argument('--video-output', default=None, help="어노테이션 동영상 저장 경로")
+    parser.add_argument('--headless', action='store_true', help="화면에 표시하지 않음")
+    parser.add_argument('--max-interval', type=int, default=10, help="탐지 간격의 최댓값 (프레임)")
+    parser.add_argument('--conf', type=float, default=0.5, help="최소 신뢰도 (추론 단계에서 NMS 전에 적용)")
+    parser.add_argument('--iou', type=float, default=0.7, help="NMS IoU 기준")
+    parser.add_argument('--max-det', type=int, default=300, help="이미지당 최대 탐지 수")
+    parser.add_argument('--classes', nargs='+', default=None, help="탐지할 클래스 이름 또는 ID (예: person car)")
+    parser.add_argument('--input', default=None, help="입력 이미지 경로 (기본값: 예제 이미지)")
+    parser.add_argument('--output', default=None, help="출력 이미지 경로 (기본값: output.jpg)")
+    parser.add_argument('--sliced', action='store_true', help="겹치는 타일로 나누어 탐지 (고해상도 이미지용)")
+    parser.add_argument('--tile-size', type=int, default=640, help="슬라이스 타일 크기 (픽셀)")
+    parser.add_argument('--tile-overlap', type=float, default=0.2, help="슬라이스 타일 겹침 비율")
+    return parser.parse_args()
+
+def load_pipeline(args):
+    """
+    명령행 인자로 모델을 로드하고 탐지 옵션을 만듭니다.
+    
+    Returns:
+        model, options (실패 시 None, None)
+    """
+    model = load_model(args.weights, warmup=args.warmup, weights_dir=args.weights_dir,
+                       offline=args.offline, backend=args.backend)
+    if model is None:
+        return None, None
+    try:
+        options = inference_options(model, args.conf, args.iou, args.max_det, args.classes)
+    except ValueError as e:
+        print(f"탐지 옵션 오류: {e}")
+        return None, None
+    return model, options
+
 def main():
     """
     메인 함수 - 객체 탐지 파이프라인을 실행합니다.
     """
+    args = parse_args()
     print("=== 객체 탐지 프로그램 시작 ===")
     
+    cache = None
+    if args.cache is not None:
+        from cache import DetectionCache
+        cache = DetectionCache(args.cache, args.cache_size * 1024 * 1024)
+    
+    if args.video is not None:
+        model, options = load_pipeline(args)
+        if model is None:
+            return
+        source = int(args.video) if args.video.isdigit() else args.video
+        stream_detection(model, source, args.video_output, not args.headless, options, args.max_interval)
+        return
+    
+    if args.batch:
+        model, options = load_pipeline(args)
+        if model is None:
+            return
+        run_batch(model, args.batch, args.output_dir, args.batch_size, args.threads,
+                  args.export, args.export_format, not args.no_images, cache, options)
+        if cache is not None:
+            print(f"캐시 통계: {cache.stats()}")
+        return
+    
     # 파일 경로 설정
     current_dir = os.path.dirname(os.path.abspath(__file__))
-    input_image = os.path.join(current_dir, "2477308902_443e5baf08_z.jpg")
-    output_image = os.path.join(current_dir, "output.jpg")
+    input_image = args.input or os.path.join(current_dir, "2477308902_443e5baf08_z.jpg")
+    output_image = args.output or os.path.join(current_dir, "output.jpg")
     
     # 입력 이미지 존재 확인
     if not os.path.exists(input_image):
@@ -149,19 +1147,20 @@ def main():
     
     # 1. 모델 로드
     print("1. YOLOv8 모델 로드 중...")
-    model = load_model()
+    model, options = load_pipeline(args)
     if model is None:
         return
     
     # 2. 객체 탐지
     print("2. 객체 탐지 수행 중...")
-    results, original_image = detect_objects(model, input_image)
+    results, original_image = detect_objects(model, input_image, args.sliced, args.tile_size, args.tile_overlap,
+                                             cache, options)
     if results is None or original_image is None:
         return
     
-    # 3. 결과 시각화
+    # 3. 결과 시각화 (신뢰도 / 클래스는 추론 단계에서 이미 걸러짐)
     print("3. 탐지 결과 시각화 중...")
-    annotated_image = draw_detections(original_image, results)
+    annotated_image = draw_detections(original_image, results, conf_threshold=None)
     
     # 4. 결과 저장
     print("4. 결과 이미지 저장 중...")
@@ -172,7 +1171,8 @@ def main():
     # OpenCV BGR을 RGB로 변환
     annotated_rgb = cv2.cvtColor(annotated_image, cv2.COLOR_BGR2RGB)
     
-    # 결과 이미지 표시
+    # 결과 이미지 표시 (matplotlib은 화면 표시에만 필요하므로 여기서 import)
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(12, 8))
     plt.imshow(annotated_rgb)
     plt.title('Object Detection Results', fontsize=16, fontweight='bold')
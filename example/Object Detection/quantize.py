@@ -0,0 +1,331 @@
+"""
+INT8 Quantization
+ONNX로 내보낸 YOLOv8 모델을 정적(static) INT8 양자화하고
+fp32 모델과 정확도(mAP@0.5), 지연 시간, 모델 크기를 비교하는 도구
+
+사용 예:
+    # 1) 보정 이미지 폴더로 양자화 (yolov8n.onnx가 없으면 yolov8n.pt에서 내보냄)
+    python quantize.py --calib-dir calib_images/
+
+    # 2) YOLO 형식 라벨 데이터셋(images/, labels/)으로 fp32와 비교
+    python quantize.py --calib-dir calib_images/ --eval-dir dataset/images/val --report report.json
+
+    # 3) 양자화된 모델로 탐지
+    python main.py --weights yolov8n_int8.onnx --backend onnxruntime
+"""
+
+import os
+import json
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from main import box_iou, collect_image_paths, detections_from_results, letterbox, load_model, resolve_weights
+
+def _load_calibration_blobs(image_dir, imgsz=640, max_images=200):
+    """보정 이미지를 모델 입력 형태 (1, 3, imgsz, imgsz)로 전처리합니다."""
+    for image_path in collect_image_paths(image_dir)[:max_images]:
+        image = cv2.imread(image_path)
+        if image is None:
+            continue
+        padded, _, _ = letterbox(image, imgsz)
+        yield cv2.dnn.blobFromImage(padded, 1 / 255.0, swapRB=True)
+
+def _head_node_names(model_path):
+    """
+    YOLOv8 탐지 헤드의 박스 디코딩 노드 이름을 찾습니다. (Conv 제외)
+
+    DFL / 좌표 변환 / 최종 Concat은 값의 범위가 넓어 INT8로 바꾸면 박스 위치가 크게 틀어지므로
+    양자화에서 제외합니다.
+    """
+    import onnx
+
+    graph = onnx.load(model_path).graph
+    head = [node for node in graph.node if node.name.startswith('/model.22/')]
+    return [node.name for node in head if node.op_type != 'Conv']
+
+def quantize_model(fp32_path, int8_path, calib_dir, imgsz=640, max_images=200, per_channel=False,
+                   exclude_head=True):
+    """
+    보정 이미지로 fp32 ONNX 모델을 정적 INT8 양자화합니다.
+
+    Args:
+        fp32_path: fp32 .onnx 파일 경로
+        int8_path: 저장할 INT8 .onnx 파일 경로
+        calib_dir: 보정 이미지 디렉토리 (실제 사용 환경과 비슷한 이미지 100~200장 권장)
+        imgsz: 모델 입력 크기
+        max_images: 보정에 사용할 최대 이미지 수
+        per_channel: 채널별 가중치 양자화 여부
+        exclude_head: 탐지 헤드의 박스 디코딩 노드를 fp32로 유지할지 여부
+
+    Returns:
+        int8_path: 양자화된 모델 경로 (실패 시 None)
+    """
+    try:
+        from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                              quantize_static)
+
+        class FolderDataReader(CalibrationDataReader):
+            def __init__(self, input_name):
+                self.input_name = input_name
+                self.blobs = _load_calibration_blobs(calib_dir, imgsz, max_images)
+
+            def get_next(self):
+                blob = next(self.blobs, None)
+                return None if blob is None else {self.input_name: blob}
+
+        import onnxruntime
+        session = onnxruntime.InferenceSession(fp32_path, providers=['CPUExecutionProvider'])
+        input_name = session.get_inputs()[0].name
+        del session
+
+        if not collect_image_paths(calib_dir):
+            raise FileNotFoundError(f"보정 이미지를 찾을 수 없습니다: {calib_dir}")
+
+        # 그래프 최적화 / 형태 추론을 먼저 적용하면 양자화 결과가 안정적임
+        source_path = fp32_path
+        prepared_path = os.path.splitext(int8_path)[0] + '_prep.onnx'
+        try:
+            from onnxruntime.quantization.shape_inference import quant_pre_process
+            quant_pre_process(fp32_path, prepared_path)
+            source_path = prepared_path
+        except Exception as e:
+            print(f"양자화 전처리를 건너뜁니다: {e}")
+
+        start = time.perf_counter()
+        quantize_static(
+            source_path, int8_path, FolderDataReader(input_name),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            nodes_to_exclude=_head_node_names(source_path) if exclude_head else [],
+        )
+        print(f"INT8 양자화가 완료되었습니다: {int8_path} ({time.perf_counter() - start:.1f}초)")
+
+        if source_path != fp32_path and os.path.exists(prepared_path):
+            os.remove(prepared_path)
+        return int8_path
+    except Exception as e:
+        print(f"양자화 중 오류 발생: {e}")
+        return None
+
+def load_labels(image_path, labels_dir=None):
+    """
+    YOLO 형식 라벨 (클래스 cx cy w h, 0~1 정규화)을 읽어 픽셀 xyxy 좌표로 변환합니다.
+
+    labels_dir가 없으면 경로의 'images' 폴더를 'labels'로 바꾼 위치, 그다음 이미지와 같은 폴더를 찾습니다.
+
+    Returns:
+        boxes: (N, 4) xyxy 좌표, classes: (N,) 클래스 ID (이미지를 읽지 못하면 None)
+    """
+    stem = os.path.splitext(os.path.basename(image_path))[0] + '.txt'
+    image_dir = os.path.dirname(image_path)
+    if labels_dir is not None:
+        candidates = [os.path.join(labels_dir, stem)]
+    else:
+        # 마지막 'images' 폴더만 'labels'로 바꿈 (ultralytics 데이터셋 구조)
+        parts = image_dir.split(os.sep)
+        if 'images' in parts:
+            parts[len(parts) - 1 - parts[::-1].index('images')] = 'labels'
+        swapped = os.sep.join(parts)
+        candidates = [os.path.join(swapped, stem), os.path.join(image_dir, stem)]
+
+    image = cv2.imread(image_path)
+    if image is None:
+        return None
+    height, width = image.shape[:2]
+
+    rows = np.zeros((0, 5), dtype=np.float32)
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            rows = np.loadtxt(candidate, dtype=np.float32, ndmin=2).reshape(-1, 5)
+            break
+
+    cx, cy, w, h = rows[:, 1] * width, rows[:, 2] * height, rows[:, 3] * width, rows[:, 4] * height
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    return boxes, rows[:, 0].astype(int)
+
+def average_precision(recall, precision):
+    """101점 보간 AP (COCO / ultralytics 검증과 같은 방식)"""
+    recall = np.concatenate(([0.0], recall, [1.0]))
+    precision = np.concatenate(([1.0], precision, [0.0]))
+    precision = np.flip(np.maximum.accumulate(np.flip(precision)))
+    points = np.linspace(0, 1, 101)
+    trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+    return trapezoid(np.interp(points, recall, precision), points)
+
+def evaluate_map(model, image_paths, labels_dir=None, iou_threshold=0.5, conf=0.001):
+    """
+    라벨 데이터셋에서 mAP@0.5를 계산합니다.
+
+    Args:
+        model: load_model()로 로드한 모델 (모든 백엔드)
+        image_paths: 평가 이미지 경로 리스트
+        labels_dir: 라벨 디렉토리 (None이면 자동으로 찾음)
+        iou_threshold: 정답으로 인정할 IoU
+        conf: 평가용 최소 신뢰도 (mAP는 낮은 신뢰도까지 포함해 계산)
+
+    Returns:
+        map50: 라벨에 있는 클래스들의 평균 AP
+    """
+    scores, matched, predicted_classes = [], [], []
+    label_counts = {}
+
+    for image_path in image_paths:
+        labels = load_labels(image_path, labels_dir)
+        if labels is None:
+            continue
+        label_boxes, label_classes = labels
+        for class_id in label_classes:
+            label_counts[class_id] = label_counts.get(class_id, 0) + 1
+
+        detections = detections_from_results(model(cv2.imread(image_path), conf=conf, verbose=False))
+        order = np.argsort(-detections['conf'])
+        boxes, confs, classes = detections['xyxy'][order], detections['conf'][order], detections['cls'][order]
+
+        # 신뢰도가 높은 예측부터 같은 클래스의 남은 정답과 탐욕적으로 짝지음
+        hits = np.zeros(len(boxes), dtype=bool)
+        if len(boxes) and len(label_boxes):
+            ious = box_iou(boxes, label_boxes)
+            ious[classes[:, None] != label_classes[None, :]] = 0
+            used = np.zeros(len(label_boxes), dtype=bool)
+            for i in range(len(boxes)):
+                candidates = np.where(~used & (ious[i] >= iou_threshold))[0]
+                if len(candidates):
+                    best = candidates[ious[i, candidates].argmax()]
+                    used[best] = hits[i] = True
+
+        scores.append(confs)
+        matched.append(hits)
+        predicted_classes.append(classes)
+
+    if not label_counts:
+        return 0.0
+
+    scores = np.concatenate(scores)
+    matched = np.concatenate(matched)
+    predicted_classes = np.concatenate(predicted_classes)
+
+    aps = []
+    for class_id, count in label_counts.items():
+        mask = predicted_classes == class_id
+        if not mask.any():
+            aps.append(0.0)
+            continue
+        order = np.argsort(-scores[mask])
+        true_positives = np.cumsum(matched[mask][order])
+        false_positives = np.cumsum(~matched[mask][order])
+        recall = true_positives / count
+        precision = true_positives / np.maximum(true_positives + false_positives, 1)
+        aps.append(average_precision(recall, precision))
+
+    return float(np.mean(aps))
+
+def measure_latency(model, image_paths, repeats=3):
+    """이미지당 추론 지연 시간 중앙값 (ms)"""
+    images = [image for image in (cv2.imread(path) for path in image_paths) if image is not None]
+    latencies = []
+    for _ in range(repeats):
+        for image in images:
+            start = time.perf_counter()
+            model(image, verbose=False)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return float(np.median(latencies)) if latencies else None
+
+def compare_models(variants, eval_dir, labels_dir=None, latency_images=20):
+    """
+    모델 변형들의 mAP@0.5, 지연 시간, 파일 크기를 비교합니다.
+
+    Args:
+        variants: [(이름, 가중치 경로, 백엔드), ...]
+        eval_dir: 평가 이미지 디렉토리
+        labels_dir: 라벨 디렉토리 (None이면 자동으로 찾음)
+        latency_images: 지연 시간 측정에 사용할 이미지 수
+
+    Returns:
+        report: {이름: {'weights', 'backend', 'size_mb', 'latency_ms', 'map50'}}
+    """
+    image_paths = collect_image_paths(eval_dir)
+    if not image_paths:
+        print(f"평가 이미지를 찾을 수 없습니다: {eval_dir}")
+        return {}
+
+    report = {}
+    for name, weights, backend in variants:
+        model = load_model(weights, backend=backend)
+        if model is None:
+            continue
+        report[name] = {
+            'weights': weights,
+            'backend': backend,
+            'size_mb': os.path.getsize(weights) / (1024 * 1024) if os.path.exists(weights) else None,
+            'latency_ms': measure_latency(model, image_paths[:latency_images]),
+            'map50': evaluate_map(model, image_paths, labels_dir),
+        }
+
+    print(f"\n=== fp32 / INT8 비교 ({len(image_paths)}개 이미지) ===")
+    print(f"{'모델':<14} {'크기(MB)':>9} {'지연(ms)':>9} {'mAP@0.5':>8}")
+    for name, row in report.items():
+        size = f"{row['size_mb']:9.1f}" if row['size_mb'] is not None else f"{'-':>9}"
+        print(f"{name:<14} {size} {row['latency_ms']:9.1f} {row['map50']:8.3f}")
+
+    return report
+
+def parse_args():
+    """
+    명령행 인자를 파싱합니다.
+    """
+    parser = argparse.ArgumentParser(description="YOLOv8 INT8 정적 양자화")
+    parser.add_argument('--weights', default='yolov8n.pt', help="fp32 PyTorch 가중치")
+    parser.add_argument('--onnx', default=None, help="fp32 ONNX 모델 (없으면 --weights에서 내보냄)")
+    parser.add_argument('--output', default=None, help="INT8 모델 경로 (기본값: <이름>_int8.onnx)")
+    parser.add_argument('--calib-dir', required=True, help="보정 이미지 디렉토리")
+    parser.add_argument('--calib-images', type=int, default=200, help="보정에 사용할 최대 이미지 수")
+    parser.add_argument('--imgsz', type=int, default=640, help="모델 입력 크기")
+    parser.add_argument('--per-channel', action='store_true', help="채널별 가중치 양자화")
+    parser.add_argument('--quantize-head', action='store_true', help="탐지 헤드의 박스 디코딩까지 양자화")
+    parser.add_argument('--eval-dir', default=None, help="YOLO 형식 라벨이 있는 평가 이미지 디렉토리")
+    parser.add_argument('--labels-dir', default=None, help="라벨 디렉토리 (기본값: images -> labels)")
+    parser.add_argument('--report', default=None, help="비교 결과를 저장할 JSON 경로")
+    return parser.parse_args()
+
+def main():
+    """
+    메인 함수
+    """
+    args = parse_args()
+
+    fp32_onnx = args.onnx
+    if fp32_onnx is None:
+        fp32_onnx = os.path.splitext(args.weights)[0] + '.onnx'
+        try:
+            fp32_onnx = resolve_weights(fp32_onnx, offline=True)
+        except FileNotFoundError:
+            from main import export_onnx
+            fp32_onnx = export_onnx(args.weights, args.imgsz)
+
+    int8_onnx = args.output or os.path.splitext(fp32_onnx)[0] + '_int8.onnx'
+    if quantize_model(fp32_onnx, int8_onnx, args.calib_dir, args.imgsz, args.calib_images,
+                      args.per_channel, exclude_head=not args.quantize_head) is None:
+        return
+
+    if args.eval_dir is None:
+        return
+
+    variants = [
+        ('fp32 (pt)', resolve_weights(args.weights), 'ultralytics'),
+        ('fp32 (onnx)', fp32_onnx, 'onnxruntime'),
+        ('int8 (onnx)', int8_onnx, 'onnxruntime'),
+    ]
+    report = compare_models(variants, args.eval_dir, args.labels_dir)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"비교 결과가 저장되었습니다: {args.report}")
+
+if __name__ == "__main__":
+    main()